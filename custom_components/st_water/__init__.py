@@ -1,10 +1,14 @@
 import logging
+from datetime import timedelta
+from functools import partial
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+import voluptuous as vol
 
-from .const import DOMAIN
+from .const import DOMAIN, SERVICE_BACKFILL, ATTR_CONFIG_ENTRY_ID
 from .coordinator import STWaterMeterUpdateCoordinator
 
 
@@ -12,6 +16,10 @@ CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 _LOGGER = logging.getLogger(__name__)
 
+PLATFORMS = [Platform.SENSOR]
+
+BACKFILL_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
 
 async def async_setup_entry(hass, entry) -> bool:
     """Set up from a config entry."""
@@ -22,15 +30,64 @@ async def async_setup_entry(hass, entry) -> bool:
         hass.data[DOMAIN][entry.entry_id] = coordinator
 
         entry.async_on_unload(entry.add_update_listener(async_reload_entry))
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+        entry.async_on_unload(
+            async_track_time_interval(
+                hass, coordinator.async_evict_idle_sessions, timedelta(minutes=1)
+            )
+        )
+        entry.async_on_unload(coordinator.async_stop)
+        entry.async_on_unload(
+            hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, coordinator.async_stop)
+        )
+        if not hass.services.has_service(DOMAIN, SERVICE_BACKFILL):
+            hass.services.async_register(
+                DOMAIN,
+                SERVICE_BACKFILL,
+                partial(_async_backfill_history, hass),
+                schema=BACKFILL_SCHEMA,
+            )
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
         _LOGGER.debug("ST Water integration setup complete")
 
         return True
 
     except Exception as err:
         _LOGGER.error("Error setting up ST Water integration: %s", err)
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
         return False
 
 
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload a config entry.
+
+    The coordinator is stopped, and its browser sessions quit, by the
+    async_on_unload callbacks registered in async_setup_entry.
+    """
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        if not any(
+            isinstance(value, STWaterMeterUpdateCoordinator)
+            for value in hass.data[DOMAIN].values()
+        ):
+            hass.services.async_remove(DOMAIN, SERVICE_BACKFILL)
+    return unload_ok
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def _async_backfill_history(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Import daily and monthly history for one or all accounts."""
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    for key, coordinator in list(hass.data.get(DOMAIN, {}).items()):
+        if not isinstance(coordinator, STWaterMeterUpdateCoordinator):
+            continue
+        if entry_id and key != entry_id:
+            continue
+        await coordinator.async_backfill_history()
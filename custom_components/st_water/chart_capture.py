@@ -0,0 +1,151 @@
+import json
+import logging
+import re
+import threading
+
+from .const import CAPTURE_PROXY_PORT, CAPTURE_PROXY_PORTS
+from .retry import SeleniumUnavailableError
+
+_LOGGER = logging.getLogger(__name__)
+
+_ports_lock = threading.Lock()
+_ports_in_use = set()
+
+# Keys the consumption endpoints use for the reading itself.
+VALUE_KEYS = ("consumption", "usage", "value", "litres", "volume", "amount")
+
+TIMESTAMP_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})[T ](\d{2}):\d{2}")
+
+
+def reserve_proxy_port():
+    """
+    Claim a free selenium-wire proxy port for a new capture driver.
+
+    Pooled drivers and the config flow's driver live at the same time, so
+    each needs its own proxy.
+
+    Returns:
+        int: A port from CAPTURE_PROXY_PORT up, to be given back with release_proxy_port().
+
+    Raises:
+        SeleniumUnavailableError: All CAPTURE_PROXY_PORTS ports are taken.
+    """
+    with _ports_lock:
+        for port in range(CAPTURE_PROXY_PORT, CAPTURE_PROXY_PORT + CAPTURE_PROXY_PORTS):
+            if port not in _ports_in_use:
+                _ports_in_use.add(port)
+                return port
+    raise SeleniumUnavailableError(
+        f"All {CAPTURE_PROXY_PORTS} capture proxy ports from {CAPTURE_PROXY_PORT} are in use"
+    )
+
+
+def release_proxy_port(port):
+    """Return a port claimed by reserve_proxy_port()."""
+    with _ports_lock:
+        _ports_in_use.discard(port)
+
+
+def is_json_response(request):
+    """Return True if a captured selenium-wire request has a JSON response."""
+    response = request.response
+    if response is None or response.status_code != 200:
+        return False
+    content_type = response.headers.get("Content-Type", "") or ""
+    return "json" in content_type
+
+
+def decode_response_body(request):
+    """Decode a captured response body into a Python object, or None."""
+    from seleniumwire.utils import decode
+
+    response = request.response
+    try:
+        body = decode(
+            response.body, response.headers.get("Content-Encoding", "identity")
+        )
+        return json.loads(body.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as err:
+        _LOGGER.debug("Could not decode response from %s: %s", request.url, err)
+        return None
+
+
+def _iter_records(payload):
+    """Yield every dict found anywhere in a JSON payload."""
+    if isinstance(payload, dict):
+        yield payload
+        for value in payload.values():
+            yield from _iter_records(value)
+    elif isinstance(payload, list):
+        for value in payload:
+            yield from _iter_records(value)
+
+
+def _record_reading(record):
+    """Return (date, hour, value) for a record that looks like a reading."""
+    timestamp = None
+    for value in record.values():
+        if isinstance(value, str):
+            match = TIMESTAMP_PATTERN.match(value)
+            if match:
+                timestamp = match
+                break
+    if timestamp is None:
+        return None
+    for key, value in record.items():
+        if key.lower() in VALUE_KEYS and isinstance(value, (int, float)) and not isinstance(value, bool):
+            return timestamp.group(1), int(timestamp.group(2)), value
+    return None
+
+
+def parse_chart_payload(payload, data=None):
+    """
+    Collect hourly readings from a chart JSON payload.
+
+    Args:
+        payload: Decoded JSON from a consumption endpoint.
+        data (dict, optional): Existing readings to merge into.
+
+    Returns:
+        dict: {"YYYY-MM-DD": {"HH:00": value}}, the same shape get_water_usage returns.
+    """
+    data = {} if data is None else data
+    for record in _iter_records(payload):
+        reading = _record_reading(record)
+        if reading is None:
+            continue
+        date, hour, value = reading
+        data.setdefault(date, {})[f"{hour:02d}:00"] = int(value)
+    return data
+
+
+def hourly_only(data):
+    """Drop dates with a single reading, which come from daily or monthly series."""
+    return {date: hours for date, hours in data.items() if len(hours) > 1}
+
+
+def capture_chart_data(driver):
+    """
+    Read hourly data from the JSON responses captured by a selenium-wire driver.
+
+    Daily and monthly series are returned by the same endpoints with one
+    reading per day, so only dates with more than one distinct hour are kept.
+
+    Args:
+        driver: A seleniumwire webdriver that has loaded the tracker page.
+
+    Returns:
+        dict: Hourly readings, empty if nothing usable was captured.
+    """
+    data = {}
+    for request in driver.requests:
+        if not is_json_response(request):
+            continue
+        payload = decode_response_body(request)
+        if payload is None:
+            continue
+        before = sum(len(hours) for hours in data.values())
+        parse_chart_payload(payload, data)
+        if sum(len(hours) for hours in data.values()) > before:
+            _LOGGER.debug("Captured chart data from %s", request.url)
+    return hourly_only(data)
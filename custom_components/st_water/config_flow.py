@@ -1,12 +1,27 @@
+import logging
+from functools import partial
 from typing import Any
 from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
 import voluptuous as vol
-from .const import DOMAIN, NAME, DEBUG_MODE, CONF_SELENIUM
-from .stw_consumption import get_water_usage
+from .const import DOMAIN, NAME, DEBUG_MODE, CONF_SELENIUM, CONF_STATISTIC_ID, SESSION_IDLE_TTL
+from .retry import (
+    ERROR_LAYOUT,
+    LoginFailedError,
+    LoginUnansweredError,
+    SeleniumUnavailableError,
+    classify_error,
+)
+from .scheduler import get_scheduler, hand_off_pool
+from .session import DriverPool
+from .stw_consumption import CAPTURE_ENABLED, create_driver, verify_login
+
+_LOGGER = logging.getLogger(__name__)
 
 CANNOT_CONNECT = "cannot_connect"
 INVALID_AUTH = "invalid_auth"
+PORTAL_CHANGED = "portal_changed"
+UNKNOWN = "unknown"
 
 
 class STWaterConfigFlow(ConfigFlow, domain=DOMAIN):
@@ -28,22 +43,41 @@ class STWaterConfigFlow(ConfigFlow, domain=DOMAIN):
             )
 
         if user_input is not None:
+            await self.async_set_unique_id(user_input[CONF_USERNAME].lower())
+            self._abort_if_unique_id_configured()
+            # The coordinator takes over this pool, and the logged-in session in it
+            pool = DriverPool(
+                partial(create_driver, user_input[CONF_SELENIUM], CAPTURE_ENABLED),
+                SESSION_IDLE_TTL,
+            )
+            scheduler = get_scheduler(self.hass)
+            scheduler.add_pool(user_input[CONF_SELENIUM], pool)
             try:
-                result = await self.hass.async_add_executor_job(
-                    get_water_usage,
-                    user_input[CONF_USERNAME],
-                    user_input[CONF_PASSWORD],
-                    user_input[CONF_SELENIUM]
-                )
-                if result:
-                    return self.async_create_entry(
-                        title=NAME,
-                        data=user_input,
+                async with scheduler.slot(
+                    user_input[CONF_SELENIUM], "config flow", jitter=False, pool=pool
+                ):
+                    await self.hass.async_add_executor_job(
+                        verify_login,
+                        user_input[CONF_USERNAME],
+                        user_input[CONF_PASSWORD],
+                        user_input[CONF_SELENIUM],
+                        pool,
                     )
-                else:
-                    errors["base"] = INVALID_AUTH
-            except Exception:
+            except LoginFailedError:
+                errors["base"] = INVALID_AUTH
+            except SeleniumUnavailableError as err:
+                _LOGGER.warning("Cannot reach Selenium: %s", err)
+                errors["base"] = CANNOT_CONNECT
+            except LoginUnansweredError as err:
+                _LOGGER.warning("No answer from the portal: %s", err)
                 errors["base"] = CANNOT_CONNECT
+            except Exception as err:
+                _LOGGER.warning("Log-in check failed: %s", err)
+                errors["base"] = PORTAL_CHANGED if classify_error(err) == ERROR_LAYOUT else UNKNOWN
+            else:
+                hand_off_pool(self.hass, self.unique_id, pool)
+                return self._create_account_entry(user_input)
+            await self.hass.async_add_executor_job(pool.close)
 
         return self.async_show_form(
             step_id="user",
@@ -56,3 +90,25 @@ class STWaterConfigFlow(ConfigFlow, domain=DOMAIN):
             ),
             errors=errors,
         )
+
+    def _create_account_entry(self, user_input: dict[str, Any]) -> ConfigFlowResult:
+        """Create the entry with its own statistic ID.
+
+        The first account keeps the original st_water:consumption statistic so
+        existing dashboards carry on working; further accounts are numbered so
+        the log-in email stays out of titles and statistic IDs.
+        """
+        entries = self._async_current_entries()
+        if not entries:
+            return self.async_create_entry(
+                title=NAME,
+                data={**user_input, CONF_STATISTIC_ID: f"{DOMAIN}:consumption"},
+            )
+        used = {entry.data.get(CONF_STATISTIC_ID) for entry in entries}
+        number = 2
+        while f"{DOMAIN}:consumption_{number}" in used:
+            number += 1
+        return self.async_create_entry(
+            title=f"{NAME} {number}",
+            data={**user_input, CONF_STATISTIC_ID: f"{DOMAIN}:consumption_{number}"},
+        )
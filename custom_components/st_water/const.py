@@ -9,4 +9,119 @@ SCAN_INTERVAL = 86400  # seconds (24 hours)
 DEBUG_MODE = False  # Set to False for production
 
 LOGIN_PAGE = "https://www.stwater.co.uk/log-in/"
-CONF_SELENIUM = "Selenium URL"
\ No newline at end of file
+CONF_SELENIUM = "Selenium URL"
+# How the hourly chart is read: "script" (one execute_script call per day),
+# "page_source" (one page snapshot parsed locally) or "element" (one WebDriver
+# call per element, the original behaviour).
+EXTRACTION_MODE = "script"
+
+# Read the hourly data from the chart's JSON responses via selenium-wire instead
+# of clicking through each day. The remote browser must be able to reach the
+# capture proxy running inside Home Assistant on CAPTURE_PROXY_HOST. Each
+# capture browser gets its own proxy on the next free port from
+# CAPTURE_PROXY_PORT, up to CAPTURE_PROXY_PORTS of them at once.
+CAPTURE_CHART_JSON = False
+CAPTURE_PROXY_HOST = None
+CAPTURE_PROXY_PORT = 8087
+CAPTURE_PROXY_PORTS = 4
+
+# Lean browser profile: return from page loads at DOMContentLoaded, skip images
+# and web fonts, and resolve the analytics and marketing hosts below to nothing.
+# The scraper waits for the elements it needs, so none of these should be
+# required; off until it has been timed against the live portal.
+LEAN_BROWSER = False
+BROWSER_WINDOW_SIZE = "1280,900"
+BLOCKED_HOSTS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "facebook.net",
+    "facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "snap.licdn.com",
+    "ads.linkedin.com",
+    "tiktok.com",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+]
+
+# Fetch consumption with a plain HTTP client using cookies exported from the
+# last browser login, only starting Chrome again when that session expires.
+HTTP_CLIENT_MODE = False
+HTTP_TIMEOUT = 30  # seconds
+
+# The Selenium grid's --session-timeout: it ends a session left idle this long.
+GRID_SESSION_TIMEOUT = 300  # seconds, Selenium's default
+# Seconds an idle, logged-in browser session is kept for the next refresh,
+# kept below GRID_SESSION_TIMEOUT so the grid has not ended it by then. A
+# session is only kept when the next refresh is due within this time;
+# otherwise it is quit after the fetch. Set to 0 to always quit it.
+SESSION_IDLE_TTL = GRID_SESSION_TIMEOUT - 60
+
+# Deadline in seconds for each phase of a browser fetch. Driver start-up counts
+# towards login, login_submit covers waiting for the portal to answer the
+# log-in form, navigation covers opening the tracker and switching to the Day
+# view, and extraction covers walking the days.
+PHASE_TIMEOUTS = {
+    "login": 50,
+    "login_submit": 30,
+    "navigation": 15,
+    "extraction": 50,
+    # Each of the Week and Month walks in a history backfill
+    "backfill": 300,
+}
+
+# Browser sessions allowed at once on each Selenium URL, across all accounts.
+MAX_SESSIONS_PER_GRID = 1
+# Up to this many seconds of random delay before each scheduled browser fetch,
+# so accounts sharing a grid do not all start at the same moment.
+REFRESH_JITTER = 120
+
+CONF_STATISTIC_ID = "statistic_id"
+
+# Rows per async_add_external_statistics call during a history backfill.
+BACKFILL_CHUNK_SIZE = 200
+
+SERVICE_BACKFILL = "backfill_history"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+
+# Number of past refreshes kept for diagnostics.
+FETCH_HISTORY_SIZE = 50
+
+# Learn when new data is published and poll around that time instead of every
+# SCAN_INTERVAL. Until enough publishes are seen, polls run every
+# ADAPTIVE_MAX_INTERVAL (or SCAN_INTERVAL if that is shorter).
+ADAPTIVE_REFRESH = True
+ADAPTIVE_MIN_OBSERVATIONS = 3
+ADAPTIVE_MIN_INTERVAL = 1800  # seconds, first retry after the predicted time
+ADAPTIVE_MAX_INTERVAL = 21600  # seconds, longest back-off while waiting
+
+# Derived usage sensors: days of daily totals kept, and the end of the overnight
+# hours (local time, exclusive) whose minimum hourly use indicates a leak.
+DERIVED_DAYS = 8
+OVERNIGHT_END_HOUR = 5
+
+# Version of the per-entry state kept in .storage.
+STORAGE_VERSION = 1
+# Key of the cached end and sum of the last written hour in that state.
+STORE_LAST_STATISTIC = "last_statistic"
+
+# Read the tracker landing view after log-in and skip the Day walk when it
+# shows nothing newer than the stored statistics.
+PROBE_BEFORE_FETCH = True
+
+# Attempts per fetch. Transient errors resume in the same browser session after
+# a backoff of RETRY_BACKOFF * 2^(attempt - 1) seconds (with jitter, capped at
+# RETRY_MAX_DELAY); rejected credentials and portal layout changes are not retried.
+FETCH_RETRIES = 3
+RETRY_BACKOFF = 5  # seconds
+RETRY_MAX_DELAY = 60  # seconds
+
+# Overall limit for a browser fetch: every attempt running each of its phases
+# to the deadline, plus the longest backoff between attempts.
+FETCH_TIMEOUT = FETCH_RETRIES * sum(
+    PHASE_TIMEOUTS[phase] for phase in ("login", "login_submit", "navigation", "extraction")
+) + sum(min(RETRY_BACKOFF * 2 ** attempt, RETRY_MAX_DELAY) for attempt in range(FETCH_RETRIES - 1))
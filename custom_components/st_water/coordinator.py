@@ -1,22 +1,116 @@
 import asyncio
 import logging
 import time
+from collections import deque
+from functools import partial
 import homeassistant.util.dt as dt_util
-from datetime import datetime, timedelta
-from homeassistant.core import HomeAssistant
+from datetime import date, datetime, time as dt_time, timedelta
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.const import CONF_USERNAME, CONF_PASSWORD
 from homeassistant.components.recorder.statistics import async_add_external_statistics, get_last_statistics
 from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
-from .stw_consumption import get_water_usage
-from .const import DOMAIN, SCAN_INTERVAL, DEBUG_MODE, NAME, CONSUMPTION_NAME, CONF_SELENIUM
-from .util import async_load_debug_data
+from .stw_consumption import CAPTURE_ENABLED, create_driver, get_usage_history, iter_water_usage
+from .http_client import PortalSession, SessionExpiredError
+from .session import DriverPool
+from .fetch_control import FetchControl
+from .metrics import FetchMetrics
+from .scheduler import get_scheduler, get_single_flight, take_handed_off_pool
+from .publish_model import PublishModel
+from .derived import DerivedUsage
+from .const import (
+    DOMAIN,
+    SCAN_INTERVAL,
+    DEBUG_MODE,
+    CONSUMPTION_NAME,
+    CONF_SELENIUM,
+    CONF_STATISTIC_ID,
+    HTTP_CLIENT_MODE,
+    SESSION_IDLE_TTL,
+    BACKFILL_CHUNK_SIZE,
+    FETCH_HISTORY_SIZE,
+    ADAPTIVE_REFRESH,
+    PROBE_BEFORE_FETCH,
+    FETCH_TIMEOUT,
+    STORAGE_VERSION,
+    STORE_LAST_STATISTIC,
+)
+from .util import async_load_debug_data, async_load_debug_recording
+from .replay import ReplayDriver
 from homeassistant.components.recorder import get_instance
 from operator import itemgetter
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def build_statistics(usage_data, last_end, running_total):
+    """
+    Turn scraped hourly usage into statistics rows newer than last_end.
+
+    Args:
+        usage_data (dict): {"YYYY-MM-DD": {"HH:MM": litres}} as returned by get_water_usage.
+        last_end (datetime | None): End of the last stored hour (UTC), None if nothing is stored.
+        running_total (float): The stored sum at last_end.
+
+    Returns:
+        tuple: (list of StatisticData, running total after the last row)
+    """
+    statistics = []
+    time_zone = dt_util.DEFAULT_TIME_ZONE
+    for date_str in sorted(usage_data):
+        # One date parse per day; hours are applied to this local midnight
+        day_base = datetime.combine(date.fromisoformat(date_str), dt_time.min, tzinfo=time_zone)
+        if last_end is not None and dt_util.as_utc(day_base + timedelta(days=1)) <= last_end:
+            _LOGGER.debug("Skipping date: %s", date_str)
+            continue
+        for hour_str, value in sorted(usage_data[date_str].items()):
+            start = dt_util.as_utc(day_base.replace(hour=int(hour_str[:2])))
+            if last_end is not None and start < last_end:
+                continue
+            running_total += float(value)
+            statistics.append(
+                StatisticData(
+                    start=start,
+                    state=float(value),
+                    sum=running_total
+                )
+            )
+    return statistics, running_total
+
+
+def landing_is_stored(landing, last_end, stored_signature=None):
+    """
+    Decide whether a tracker landing view can only show data that is already stored.
+
+    The Day view opens on its oldest day, so the view's dates only count when
+    its Next period button is disabled and nothing newer exists.
+
+    Args:
+        landing (TrackerProbe): What the landing view shows.
+        last_end (datetime | None): End of the last stored hour (UTC).
+        stored_signature (str, optional): Signature of the last landing view that was fully stored.
+
+    Returns:
+        bool: True if the Day walk can be skipped.
+    """
+    if last_end is None or not landing.newest:
+        return False
+    if landing.signature == stored_signature:
+        return True
+    if landing.latest_day is None:
+        return False
+    latest = datetime.combine(
+        date.fromisoformat(landing.latest_day), dt_time.min, tzinfo=dt_util.DEFAULT_TIME_ZONE
+    )
+    if landing.latest_hour is None:
+        latest += timedelta(days=1)
+    else:
+        latest = latest.replace(hour=landing.latest_hour) + timedelta(hours=1)
+    return dt_util.as_utc(latest) <= last_end
+
+
 class STWaterMeterUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching ST Water data."""
 
@@ -29,22 +123,185 @@ class STWaterMeterUpdateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=SCAN_INTERVAL),
         )
         self._entry = entry
-        self._current_data = None
+        # Entries created before multi-account support keep the original ID
+        self.statistic_id = entry.data.get(CONF_STATISTIC_ID, f"{DOMAIN}:consumption")
+        self._last_end = None
+        self._running_total = 0
+        self._write_failed = False
+        self._portal_session = None
+        self._fetch_control = None
+        self._metrics = None
+        self.fetch_history = deque(maxlen=FETCH_HISTORY_SIZE)
+        self.publish_model = PublishModel()
+        self.derived = DerivedUsage()
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._stored = None
+        self._reconciled = False
+        self._new_rows = 0
+        self._landing = None
+        self._probe_unchanged = False
+        # Start with the session the config flow logged in, if it left one
+        self.driver_pool = take_handed_off_pool(hass, entry.unique_id) or DriverPool(
+            partial(create_driver, entry.data[CONF_SELENIUM], CAPTURE_ENABLED),
+            SESSION_IDLE_TTL,
+        )
+        get_scheduler(hass).add_pool(entry.data[CONF_SELENIUM], self.driver_pool)
 
     async def _async_update_data(self):
         """Fetch data from ST Water website."""
+        # Refreshes triggered together for this account share one fetch
+        await get_single_flight(self.hass).run(self._entry.entry_id, self._async_fetch_and_store)
+
+    async def _async_fetch_and_store(self):
+        self._metrics = FetchMetrics()
+        self._new_rows = 0
+        if self._stored is None:
+            await self._async_load_store()
         try:
             await self.insert_statistics()
         except Exception as err:
+            self._metrics.finish(False, err)
             _LOGGER.error("Error updating water consumption data: %s", err)
             raise UpdateFailed(f"Error fetching data: {err}")
+        else:
+            self._metrics.finish(True)
+        finally:
+            self.fetch_history.append(self._metrics.as_dict())
+            if ADAPTIVE_REFRESH:
+                await self._async_plan_next_refresh()
+            await self._async_quit_sessions_not_needed()
 
+    async def _async_load_store(self):
+        """Read this entry's persisted state, including learned publish times."""
+        self._stored = await self._store.async_load() or {}
+        self.publish_model = PublishModel(self._stored.get("publish_times"))
+        self.derived = DerivedUsage(self._stored.get("derived"))
 
-    async def insert_statistics(self):
-        """Insert statistics into recorder."""
-        start_time = time.time()
-        statistic_id = f"{DOMAIN}:consumption"
-        _LOGGER.info("Fetching water consumption data")
+    def _store_data(self):
+        self._stored["publish_times"] = list(self.publish_model.observations)
+        self._stored["derived"] = self.derived.as_dict()
+        return self._stored
+
+    async def _async_save_store(self):
+        await self._store.async_save(self._store_data())
+
+    async def _async_last_statistic(self):
+        """
+        Return the end and sum of the last stored hour.
+
+        They come from the Store, which is updated with every write, so the
+        recorder is only queried on the first refresh after start-up, after a
+        failed write, or when the cached values do not look right.
+
+        Returns:
+            tuple: (end as a UTC datetime or None, running sum)
+        """
+        cached = self._stored.get(STORE_LAST_STATISTIC)
+        if (
+            self._reconciled
+            and not self._write_failed
+            and cached
+            and cached["statistic_id"] == self.statistic_id
+            and cached["end"] % 3600 == 0
+            and cached["end"] <= time.time()
+            and cached["sum"] >= 0
+        ):
+            return dt_util.utc_from_timestamp(cached["end"]), cached["sum"]
+
+        with self._metrics.phase("recorder_read"):
+            last_stats = await self._async_get_last_stats(self.statistic_id)
+        _LOGGER.debug("last_stats: %s", last_stats)
+        self._reconciled = True
+        if not last_stats:
+            self._stored.pop(STORE_LAST_STATISTIC, None)
+            return None, 0
+        if cached and cached.get("end") != last_stats["end"]:
+            _LOGGER.debug("Cached last statistic %s replaced from the recorder", cached)
+        self._stored[STORE_LAST_STATISTIC] = {
+            "statistic_id": self.statistic_id,
+            "end": last_stats["end"],
+            "sum": last_stats["sum"],
+        }
+        return dt_util.utc_from_timestamp(last_stats["end"]), last_stats["sum"]
+
+    async def _async_plan_next_refresh(self):
+        """Feed this poll to the publish model and schedule the next one from it."""
+        now = dt_util.now()
+        self.publish_model.record_poll(now, self._new_rows > 0)
+        self.update_interval = self.publish_model.next_interval(now)
+        _LOGGER.debug(
+            "%s: next refresh in %s (publish window %s)",
+            self._entry.title,
+            self.update_interval,
+            self.publish_model.window(),
+        )
+        if self._new_rows:
+            await self._async_save_store()
+
+    @property
+    def last_fetch(self):
+        """Metrics of the most recent refresh, or None before the first one."""
+        return self.fetch_history[-1] if self.fetch_history else None
+
+    async def async_cancel_fetch(self, *_):
+        """Stop a running browser fetch and quit its session."""
+        control = self._fetch_control
+        if control is not None:
+            await self.hass.async_add_executor_job(control.cancel)
+
+    async def async_close_sessions(self, *_):
+        """Quit any pooled browser sessions."""
+        await self.hass.async_add_executor_job(self.driver_pool.close)
+
+    async def async_stop(self, *_):
+        """Stop refreshing, cancel a running fetch and quit all browser sessions."""
+        await self.async_shutdown()
+        get_single_flight(self.hass).cancel(self._entry.entry_id)
+        await self.async_cancel_fetch()
+        await self.async_close_sessions()
+
+    async def _async_quit_sessions_not_needed(self):
+        """Quit idle sessions now unless the next refresh is due before they expire.
+
+        Refreshes are normally far further apart than the grid keeps an idle
+        session, so holding one would only occupy a grid slot until it expired.
+        """
+        interval = self.update_interval
+        if interval is None or interval.total_seconds() > SESSION_IDLE_TTL:
+            await self.hass.async_add_executor_job(self.driver_pool.evict_idle, 0)
+
+    async def async_evict_idle_sessions(self, *_):
+        """Quit pooled browser sessions that have been idle too long."""
+        await self.hass.async_add_executor_job(self.driver_pool.evict_idle)
+
+    def _store_portal_session(self, driver):
+        """Keep the browser's cookies for HTTP fetches (runs in executor)."""
+        try:
+            self._portal_session = PortalSession.from_driver(driver)
+        except Exception as err:
+            _LOGGER.warning("Could not export portal session: %s", err)
+            self._portal_session = None
+
+    async def _async_fetch_over_http(self):
+        """Fetch with the exported session, or return None if a browser is needed."""
+        if not HTTP_CLIENT_MODE or self._portal_session is None:
+            return None
+        try:
+            data = await self._portal_session.async_get_water_usage(
+                async_get_clientsession(self.hass)
+            )
+        except SessionExpiredError as err:
+            _LOGGER.debug("Portal session expired, logging in again: %s", err)
+            self._portal_session = None
+            return None
+        except Exception as err:
+            _LOGGER.warning("HTTP fetch failed, falling back to Selenium: %s", err)
+            return None
+        return data or None
+
+
+    async def _async_get_last_stats(self, statistic_id):
+        """Return the last stored row of a statistic, or a falsy value if there is none."""
         try:
             last_stats = await get_instance(self.hass).async_add_executor_job(
                 get_last_statistics, self.hass, 1, statistic_id, True, {
@@ -55,71 +312,266 @@ class STWaterMeterUpdateCoordinator(DataUpdateCoordinator):
                 last_stats = sorted(last_stats, key=itemgetter("start"), reverse=False)[0]
         except AttributeError:
             last_stats = None
-        _LOGGER.debug("last_stats: %s", last_stats)
+        return last_stats
 
-        if DEBUG_MODE:
-            _LOGGER.debug("Debug mode is enabled, loading debug data")
-            self._current_data = await async_load_debug_data(self.hass)
-            if not self._current_data:
-                raise UpdateFailed("No debug data available")
-        else:
-            try:
-                async with asyncio.timeout(120):
-                    _LOGGER.debug("Fetching data from ST Water website")
-                    self._current_data = await self.hass.async_add_executor_job(
-                        get_water_usage,
+    async def async_backfill_history(self):
+        """Import the portal's daily and monthly totals into their own statistics.
+
+        Only periods after the last stored row are written, so running it again
+        resumes an interrupted import and otherwise adds nothing.
+        """
+        control = self._fetch_control = FetchControl()
+        try:
+            async with get_scheduler(self.hass).slot(
+                self._entry.data[CONF_SELENIUM], self._entry.title, jitter=False, pool=self.driver_pool
+            ):
+                history = await self.hass.async_add_executor_job(
+                    partial(
+                        get_usage_history,
                         self._entry.data[CONF_USERNAME],
                         self._entry.data[CONF_PASSWORD],
                         self._entry.data[CONF_SELENIUM],
+                        pool=self.driver_pool,
+                        control=control,
                     )
-            except asyncio.TimeoutError:
-                _LOGGER.error("Timeout while fetching water consumption data")
-                raise UpdateFailed("Data fetch timed out")
+                )
+        except asyncio.CancelledError:
+            self.hass.async_add_executor_job(control.cancel)
+            raise
+        finally:
+            self._fetch_control = None
 
-        _LOGGER.info(
-            "Finished fetching st_water data in %.3f seconds (success: %s)",
-            time.time() - start_time,
-            bool(self._current_data),
+        today = dt_util.now().date()
+        periods = (
+            ("day", "daily", "Daily", today),
+            ("month", "monthly", "Monthly", today.replace(day=1)),
         )
+        for key, suffix, label, current in periods:
+            await self._async_import_totals(
+                f"{self.statistic_id}_{suffix}",
+                f"{self._entry.title} {label} {CONSUMPTION_NAME}",
+                history[key],
+                current,
+            )
 
-        if not self._current_data:
-            raise UpdateFailed("No data received")
+    async def _async_import_totals(self, statistic_id, name, totals, current):
+        """Write per-period totals newer than the last stored row, in chunks.
 
-        statistics = []
+        The period starting on current is still in progress. Rows are never
+        rewritten, so it is left for a later run rather than stored partial.
+        """
+        last_stats = await self._async_get_last_stats(statistic_id)
         running_total = 0
+        last_end = None
         if last_stats:
             running_total = last_stats["sum"]
-        _LOGGER.debug("running_total: %s", running_total)
-        hourly_consumption_data = sorted(self._current_data.keys())
-        _LOGGER.debug("hourly_consumption_data: %s", hourly_consumption_data)
-        for date_str in hourly_consumption_data:
-            # Skip dates that are already in the database
-            if last_stats and datetime.strptime(date_str, '%Y-%m-%d') < datetime.fromtimestamp(last_stats["end"]).replace(hour=0, minute=0, second=0, microsecond=0):
-                _LOGGER.debug("Skipping date: %s", date_str)
+            last_end = dt_util.utc_from_timestamp(last_stats["end"])
+
+        time_zone = dt_util.DEFAULT_TIME_ZONE
+        statistics = []
+        for iso_date in sorted(totals):
+            if date.fromisoformat(iso_date) >= current:
                 continue
-            hours = self._current_data[date_str]
-            for hour_str, value in sorted(hours.items()):
-                start = dt_util.as_utc(datetime.strptime(f"{date_str} {hour_str}", "%Y-%m-%d %H:%M"))
-                running_total += float(value)
-                statistics.append(
-                    StatisticData(
-                        start=start,
-                        state=float(value),
-                        sum=running_total
-                    )
-                )
+            start = dt_util.as_utc(
+                datetime.combine(date.fromisoformat(iso_date), dt_time.min, tzinfo=time_zone)
+            )
+            if last_end is not None and start < last_end:
+                continue
+            running_total += float(totals[iso_date])
+            statistics.append(
+                StatisticData(start=start, state=float(totals[iso_date]), sum=running_total)
+            )
+        _LOGGER.info("Backfilling %d rows into %s", len(statistics), statistic_id)
+        if not statistics:
+            return
 
         metadata = StatisticMetaData(
             has_mean=False,
             has_sum=True,
-            name=f"{NAME} {CONSUMPTION_NAME}",
+            name=name,
             source=DOMAIN,
             statistic_id=statistic_id,
             unit_of_measurement="L",
         )
+        recorder = get_instance(self.hass)
+        for index in range(0, len(statistics), BACKFILL_CHUNK_SIZE):
+            async_add_external_statistics(
+                self.hass, metadata, statistics[index:index + BACKFILL_CHUNK_SIZE]
+            )
+            # Let the recorder drain before queueing the next chunk
+            await recorder.async_block_till_done()
+
+    def _tracker_has_new_data(self, last_end, landing):
+        """
+        Decide from the tracker landing view whether the full Day walk is needed.
+
+        Runs in the fetch thread as the probe callback of iter_water_usage.
+
+        Args:
+            last_end (datetime | None): End of the last stored hour (UTC).
+            landing (TrackerProbe): What the landing view shows.
+
+        Returns:
+            bool: False if the view shows nothing newer than what is stored.
+        """
+        self._landing = landing
+        if landing_is_stored(landing, last_end, self._stored.get("landing_signature")):
+            self._probe_unchanged = True
+            return False
+        return True
+
+    async def insert_statistics(self):
+        """Insert statistics into recorder."""
+        start_time = time.time()
+        _LOGGER.info("Fetching water consumption data")
+        self._landing = None
+        self._probe_unchanged = False
+        last_end, self._running_total = await self._async_last_statistic()
+        self._last_end = last_end
+        self._write_failed = False
+        _LOGGER.debug("running_total: %s, last_end: %s", self._running_total, last_end)
 
-        if statistics:
-            try:
-                async_add_external_statistics(self.hass, metadata, statistics)
-            except Exception as stats_err:
-                _LOGGER.error("Failed to record statistics: %s", stats_err)
\ No newline at end of file
+        if DEBUG_MODE:
+            _LOGGER.debug("Debug mode is enabled, loading debug data")
+            self._metrics.mode = "debug"
+            pages = await async_load_debug_recording(self.hass)
+            if pages:
+                # Run the real scraper against the recorded pages
+                received = await self.hass.async_add_executor_job(
+                    self._stream_days,
+                    iter_water_usage(
+                        "debug_user",
+                        "debug_pass",
+                        "replay",
+                        pool=DriverPool(partial(ReplayDriver, pages), 0),
+                        control=FetchControl(metrics=self._metrics),
+                    ),
+                )
+            else:
+                data = await async_load_debug_data(self.hass) or {}
+                self._commit_rows(data)
+                received = len(data)
+            if not received:
+                raise UpdateFailed("No debug data available")
+        else:
+            data = await self._async_fetch_over_http()
+            if data:
+                self._metrics.mode = "http"
+                self._commit_rows(data)
+                received = len(data)
+            else:
+                control = self._fetch_control = FetchControl(metrics=self._metrics)
+                try:
+                    async with get_scheduler(self.hass).slot(
+                        self._entry.data[CONF_SELENIUM], self._entry.title, pool=self.driver_pool
+                    ), asyncio.timeout(FETCH_TIMEOUT):
+                        _LOGGER.debug("Fetching data from ST Water website")
+                        received = await self.hass.async_add_executor_job(
+                            self._stream_days,
+                            iter_water_usage(
+                                self._entry.data[CONF_USERNAME],
+                                self._entry.data[CONF_PASSWORD],
+                                self._entry.data[CONF_SELENIUM],
+                                self._store_portal_session if HTTP_CLIENT_MODE else None,
+                                pool=self.driver_pool,
+                                since=last_end.timestamp() if last_end else None,
+                                control=control,
+                                probe=(
+                                    partial(self._tracker_has_new_data, last_end)
+                                    if PROBE_BEFORE_FETCH
+                                    else None
+                                ),
+                            ),
+                        )
+                except asyncio.TimeoutError:
+                    _LOGGER.error("Timeout while fetching water consumption data")
+                    # Free the executor thread and the remote browser
+                    await self.hass.async_add_executor_job(control.cancel)
+                    raise UpdateFailed("Data fetch timed out")
+                except asyncio.CancelledError:
+                    self.hass.async_add_executor_job(control.cancel)
+                    raise
+                finally:
+                    self._fetch_control = None
+
+        _LOGGER.info(
+            "Finished fetching st_water data in %.3f seconds (days: %d, new hours: %d)",
+            time.time() - start_time,
+            received,
+            self._new_rows,
+        )
+
+        if self._probe_unchanged:
+            _LOGGER.info("No new data since %s, skipped the full fetch", last_end)
+            return
+
+        if not received:
+            raise UpdateFailed("No data received")
+
+        if self._landing is not None and not self._write_failed:
+            # Everything this landing view shows is stored now
+            self._stored["landing_signature"] = self._landing.signature
+            await self._async_save_store()
+
+    def _stream_days(self, days):
+        """
+        Hand each scraped day to the event loop to be stored as soon as it arrives.
+
+        Runs in the executor. Days queued before a fetch failure are still
+        stored; once a write fails, the rest of the walk is abandoned.
+
+        Args:
+            days (iterable): ("YYYY-MM-DD", {"HH:MM": litres}) pairs, oldest first.
+
+        Returns:
+            int: The number of days received.
+        """
+        received = 0
+        for day, hours in days:
+            if self._write_failed:
+                _LOGGER.debug("Stopping the fetch after a failed write")
+                break
+            self.hass.loop.call_soon_threadsafe(self._commit_rows, {day: hours})
+            received += 1
+        return received
+
+    @callback
+    def _commit_rows(self, usage_data):
+        """Store the hours in usage_data after the last stored one, carrying the running sum forward."""
+        if self._write_failed:
+            # The sum and end the rows would follow on from were never stored,
+            # so writing later days would leave a gap; the next refresh redoes them
+            return
+        with self._metrics.phase("build_statistics"):
+            statistics, running_total = build_statistics(
+                usage_data, self._last_end, self._running_total
+            )
+        if not statistics:
+            return
+        try:
+            with self._metrics.phase("recorder_write"):
+                async_add_external_statistics(self.hass, self._statistic_metadata(), statistics)
+        except Exception as stats_err:
+            self._write_failed = True
+            _LOGGER.error("Failed to record statistics: %s", stats_err)
+            return
+        self._running_total = running_total
+        self._last_end = statistics[-1]["start"] + timedelta(hours=1)
+        self._new_rows += len(statistics)
+        self.derived.add_rows(statistics)
+        self._stored[STORE_LAST_STATISTIC] = {
+            "statistic_id": self.statistic_id,
+            "end": self._last_end.timestamp(),
+            "sum": running_total,
+        }
+        self._store.async_delay_save(self._store_data, 1)
+
+    def _statistic_metadata(self):
+        return StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{self._entry.title} {CONSUMPTION_NAME}",
+            source=DOMAIN,
+            statistic_id=self.statistic_id,
+            unit_of_measurement="L",
+        )
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import homeassistant.util.dt as dt_util
+
+from .const import DERIVED_DAYS, OVERNIGHT_END_HOUR
+
+
+class DerivedUsage:
+    """Daily totals and leak indicators kept up to date as hourly rows are written.
+
+    Each row is folded into per-day totals, the per-night minimum and the run
+    of consecutive non-zero hours, so a refresh costs O(new rows) however much
+    history is stored. Only the last DERIVED_DAYS days are kept.
+    """
+
+    def __init__(self, state=None):
+        state = state or {}
+        self.daily = {date.fromisoformat(d): v for d, v in state.get("daily", {}).items()}
+        self.overnight = {date.fromisoformat(d): v for d, v in state.get("overnight", {}).items()}
+        self.nonzero_hours = state.get("nonzero_hours", 0)
+        self.last_start = state.get("last_start")  # UTC timestamp of the newest row
+
+    def add_rows(self, statistics):
+        """Fold newly written StatisticData rows, oldest first, into the totals."""
+        for row in statistics:
+            start = row["start"].timestamp()
+            if self.last_start is not None and start <= self.last_start:
+                continue
+            litres = row["state"]
+            local = dt_util.as_local(row["start"])
+            day = local.date()
+            self.daily[day] = self.daily.get(day, 0.0) + litres
+            if local.hour < OVERNIGHT_END_HOUR:
+                self.overnight[day] = min(self.overnight.get(day, litres), litres)
+            if litres <= 0:
+                self.nonzero_hours = 0
+            elif self.last_start is not None and start - self.last_start == 3600:
+                self.nonzero_hours += 1
+            else:
+                # First row, or a gap in the data: the run restarts here
+                self.nonzero_hours = 1
+            self.last_start = start
+        self._prune()
+
+    def _prune(self):
+        if not self.daily:
+            return
+        oldest = max(self.daily) - timedelta(days=DERIVED_DAYS - 1)
+        self.daily = {d: v for d, v in self.daily.items() if d >= oldest}
+        self.overnight = {d: v for d, v in self.overnight.items() if d >= oldest}
+
+    @property
+    def latest_day(self):
+        return max(self.daily) if self.daily else None
+
+    @property
+    def day_total(self):
+        """Litres used on the newest day with data."""
+        return self.daily[self.latest_day] if self.daily else None
+
+    @property
+    def week_total(self):
+        """Litres used over the seven days ending on the newest day with data."""
+        if not self.daily:
+            return None
+        first = self.latest_day - timedelta(days=6)
+        return sum(v for d, v in self.daily.items() if d >= first)
+
+    @property
+    def overnight_minimum(self):
+        """Lowest hourly use between midnight and OVERNIGHT_END_HOUR on the newest night with data."""
+        return self.overnight[max(self.overnight)] if self.overnight else None
+
+    def as_dict(self):
+        return {
+            "daily": {d.isoformat(): v for d, v in self.daily.items()},
+            "overnight": {d.isoformat(): v for d, v in self.overnight.items()},
+            "nonzero_hours": self.nonzero_hours,
+            "last_start": self.last_start,
+        }
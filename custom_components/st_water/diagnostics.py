@@ -0,0 +1,32 @@
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .scheduler import get_scheduler, get_single_flight
+
+# The unique ID is the log-in email
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "statistic_id": coordinator.statistic_id,
+        "last_update_success": coordinator.last_update_success,
+        "pooled_sessions": coordinator.driver_pool.idle_count,
+        "sessions_created": coordinator.driver_pool.sessions_created,
+        "scheduler": get_scheduler(hass).diagnostics(),
+        "fetches_in_flight": get_single_flight(hass).diagnostics(),
+        "fetch_history": list(coordinator.fetch_history),
+        "publish_times": list(coordinator.publish_model.observations),
+        "publish_window": coordinator.publish_model.window(),
+        "update_interval": str(coordinator.update_interval),
+    }
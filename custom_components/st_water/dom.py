@@ -0,0 +1,107 @@
+from html.parser import HTMLParser
+
+# Elements that never have a closing tag, so they must not be pushed on the stack.
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+
+
+class Node:
+    """A minimal element node built from an HTML snapshot."""
+
+    def __init__(self, tag, attrs=None, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs or {})
+        self.parent = parent
+        self.children = []
+        self._text = []
+
+    @property
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+    @property
+    def text(self):
+        """Return the text content, whitespace-collapsed like WebElement.text."""
+        parts = []
+        self._collect_text(parts)
+        return " ".join(" ".join(parts).split())
+
+    def _collect_text(self, parts):
+        for item in self._text:
+            if isinstance(item, Node):
+                item._collect_text(parts)
+            else:
+                parts.append(item)
+
+    def get_attribute(self, name):
+        return self.attrs.get(name)
+
+    def iter(self):
+        """Iterate over all descendants in document order."""
+        for child in self.children:
+            yield child
+            yield from child.iter()
+
+    def find_all(self, class_name=None, tag=None, **attrs):
+        """Return descendants matching all of the given criteria.
+
+        class_name may contain several classes separated by dots, matching the
+        way Selenium turns By.CLASS_NAME into a CSS selector.
+        """
+        wanted = [c for c in (class_name or "").split(".") if c]
+        matches = []
+        for node in self.iter():
+            if tag and node.tag != tag:
+                continue
+            if wanted and not all(c in node.classes for c in wanted):
+                continue
+            if any(node.attrs.get(k) != v for k, v in attrs.items()):
+                continue
+            matches.append(node)
+        return matches
+
+    def find(self, class_name=None, tag=None, **attrs):
+        """Return the first matching descendant or None."""
+        matches = self.find_all(class_name=class_name, tag=tag, **attrs)
+        return matches[0] if matches else None
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node("#document")
+        self._current = self.root
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, attrs, self._current)
+        self._current.children.append(node)
+        self._current._text.append(node)
+        if tag not in VOID_ELEMENTS:
+            self._current = node
+
+    def handle_startendtag(self, tag, attrs):
+        node = Node(tag, attrs, self._current)
+        self._current.children.append(node)
+        self._current._text.append(node)
+
+    def handle_endtag(self, tag):
+        # Walk up to the matching open element, tolerating unclosed children.
+        node = self._current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self._current = node.parent
+
+    def handle_data(self, data):
+        if self._current.tag not in ("script", "style"):
+            self._current._text.append(data)
+
+
+def parse_html(source):
+    """Parse an HTML document into a Node tree."""
+    builder = _TreeBuilder()
+    builder.feed(source)
+    builder.close()
+    return builder.root
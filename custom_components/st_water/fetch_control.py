@@ -0,0 +1,112 @@
+import logging
+import threading
+import time as time_module
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .const import PHASE_TIMEOUTS
+from .metrics import FetchMetrics, instrument_driver
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FetchCancelledError(Exception):
+    """The fetch was cancelled by a timeout or shutdown."""
+
+
+class FetchControl:
+    """Cancellation and per-phase deadlines for one blocking fetch.
+
+    The fetch runs in an executor thread and checks the control between steps.
+    cancel() may be called from any thread: it stops the fetch at the next
+    check and quits the attached driver so a blocked WebDriver call returns.
+    """
+
+    def __init__(self, phase_timeouts=None, clock=time_module.monotonic, metrics=None):
+        self.metrics = metrics or FetchMetrics()
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._timeouts = phase_timeouts or PHASE_TIMEOUTS
+        self._clock = clock
+        self._driver = None
+        self.phase = None
+        self._deadline = None
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise FetchCancelledError if the fetch has been cancelled."""
+        if self._event.is_set():
+            raise FetchCancelledError(f"Fetch cancelled during {self.phase or 'start-up'}")
+
+    def attach(self, driver):
+        """Remember the driver to quit on cancellation."""
+        with self._lock:
+            self._driver = driver
+        instrument_driver(driver, self.metrics)
+        if self.cancelled:
+            self._quit_driver()
+        self.check()
+
+    def detach(self):
+        with self._lock:
+            self._driver = None
+
+    def cancel(self):
+        """Stop the fetch and quit its driver (blocking, safe from any thread)."""
+        if self._event.is_set():
+            return
+        _LOGGER.debug("Cancelling fetch during %s", self.phase)
+        self._event.set()
+        self._quit_driver()
+
+    def _quit_driver(self):
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception as err:
+                _LOGGER.debug("Error quitting cancelled driver: %s", err)
+
+    def start_phase(self, phase):
+        """Start a phase with its own deadline from PHASE_TIMEOUTS."""
+        self.check()
+        self.phase = phase
+        self._deadline = self._clock() + self._timeouts[phase]
+        _LOGGER.debug("Starting %s phase", phase)
+
+    def remaining(self):
+        """Seconds left in the current phase."""
+        if self._deadline is None:
+            return max(self._timeouts.values())
+        remaining = self._deadline - self._clock()
+        if remaining <= 0:
+            raise TimeoutException(f"{self.phase} phase exceeded its deadline")
+        return remaining
+
+    def sleep(self, seconds):
+        """Sleep, waking up early if the fetch is cancelled."""
+        self._event.wait(seconds)
+        self.check()
+
+    def wait(self, target, condition, timeout=None):
+        """WebDriverWait for a condition within the phase deadline, honouring cancellation.
+
+        Args:
+            target: Driver or element to wait on.
+            condition (callable): Expected condition.
+            timeout (float, optional): Cap for optional waits that should not use the whole phase.
+        """
+
+        def _condition(driver):
+            self.check()
+            return condition(driver)
+
+        wait_for = self.remaining()
+        if timeout is not None:
+            wait_for = min(wait_for, timeout)
+        return WebDriverWait(target, wait_for, poll_frequency=0.25).until(_condition)
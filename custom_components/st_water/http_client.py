@@ -0,0 +1,93 @@
+import logging
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .chart_capture import hourly_only, parse_chart_payload
+from .const import HTTP_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lists the XHR/fetch URLs the tracker page called while drawing the chart.
+RESOURCE_URLS_SCRIPT = """
+return performance.getEntriesByType('resource')
+    .filter(e => e.initiatorType === 'xmlhttprequest' || e.initiatorType === 'fetch')
+    .map(e => e.name);
+"""
+
+
+class SessionExpiredError(Exception):
+    """The exported portal session is no longer accepted."""
+
+
+class PortalSession:
+    """Cookies and consumption endpoints exported from a logged-in browser."""
+
+    def __init__(self, cookies, endpoints, user_agent=None):
+        self.cookies = cookies
+        self.endpoints = list(endpoints)
+        self.user_agent = user_agent
+
+    @classmethod
+    def from_driver(cls, driver):
+        """Export the session from a driver showing the tracker (runs in executor)."""
+        endpoints = [
+            url for url in driver.execute_script(RESOURCE_URLS_SCRIPT) or []
+            if "stwater.co.uk" in urlparse(url).netloc
+        ]
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        _LOGGER.debug("Exported session with %d candidate endpoints", len(endpoints))
+        return cls(driver.get_cookies(), endpoints, user_agent)
+
+    def cookie_header(self, url):
+        """Build the Cookie header for a URL from the exported cookies."""
+        host = urlparse(url).hostname or ""
+        pairs = [
+            f"{cookie['name']}={cookie['value']}"
+            for cookie in self.cookies
+            if host.endswith(cookie.get("domain", host).lstrip("."))
+        ]
+        return "; ".join(pairs)
+
+    async def async_get_water_usage(self, session: aiohttp.ClientSession):
+        """
+        Fetch hourly consumption over HTTP with the exported cookies.
+
+        Args:
+            session (aiohttp.ClientSession): Shared client session, e.g. from async_get_clientsession.
+
+        Returns:
+            dict: {"YYYY-MM-DD": {"HH:00": value}}, empty if no endpoint returned hourly data.
+
+        Raises:
+            SessionExpiredError: The portal redirected to log-in or refused the cookies.
+        """
+        data = {}
+        useful = []
+        for url in self.endpoints:
+            headers = {"Cookie": self.cookie_header(url), "Accept": "application/json"}
+            if self.user_agent:
+                headers["User-Agent"] = self.user_agent
+            async with session.get(
+                url,
+                headers=headers,
+                allow_redirects=False,
+                timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            ) as response:
+                if response.status in (301, 302, 303, 307, 308, 401, 403):
+                    raise SessionExpiredError(f"{url} returned {response.status}")
+                if response.status != 200:
+                    _LOGGER.debug("Skipping %s: status %s", url, response.status)
+                    continue
+                if "json" not in response.headers.get("Content-Type", ""):
+                    # An HTML log-in page served with 200 means the session is gone
+                    raise SessionExpiredError(f"{url} did not return JSON")
+                payload = await response.json(content_type=None)
+            before = sum(len(hours) for hours in data.values())
+            parse_chart_payload(payload, data)
+            if sum(len(hours) for hours in data.values()) > before:
+                useful.append(url)
+        # Only keep endpoints that carried readings for the next refresh
+        if useful:
+            self.endpoints = useful
+        return hourly_only(data)
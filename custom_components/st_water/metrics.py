@@ -0,0 +1,78 @@
+import threading
+import time as time_module
+from contextlib import contextmanager
+
+
+class FetchMetrics:
+    """Timings and counters for one refresh."""
+
+    def __init__(self, mode="selenium"):
+        self.mode = mode
+        self.started = time_module.time()
+        self.phases = {}
+        self.days = []
+        self.commands = 0
+        self.retries = 0
+        self.success = None
+        self.error = None
+        self.duration = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """Add the time spent in the block to the named phase."""
+        start = time_module.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time_module.monotonic() - start
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+
+    def add_day(self, seconds):
+        with self._lock:
+            self.days.append(seconds)
+
+    def count_command(self):
+        with self._lock:
+            self.commands += 1
+
+    def finish(self, success, error=None):
+        self.success = success
+        self.error = str(error) if error else None
+        self.duration = time_module.time() - self.started
+
+    def as_dict(self):
+        return {
+            "mode": self.mode,
+            "started": self.started,
+            "duration": round(
+                self.duration if self.duration is not None else time_module.time() - self.started, 3
+            ),
+            "success": self.success,
+            "error": self.error,
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "days": [round(seconds, 3) for seconds in self.days],
+            "webdriver_commands": self.commands,
+            "retries": self.retries,
+        }
+
+
+def instrument_driver(driver, metrics):
+    """Count every WebDriver command a driver sends into metrics.
+
+    All driver and element commands go through WebDriver.execute, so wrapping
+    it once per driver counts them all. Pooled drivers are re-pointed at the
+    metrics of the fetch that is using them.
+    """
+    if not hasattr(driver, "execute"):
+        return
+    if not hasattr(driver, "_stw_execute"):
+        driver._stw_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            driver._stw_metrics.count_command()
+            return driver._stw_execute(driver_command, params)
+
+        driver.execute = execute
+    driver._stw_metrics = metrics
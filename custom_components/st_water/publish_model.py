@@ -0,0 +1,97 @@
+import math
+from collections import deque
+from datetime import datetime, timedelta
+
+from .const import (
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_MIN_OBSERVATIONS,
+    SCAN_INTERVAL,
+)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class PublishModel:
+    """Learn when STW publishes new data and decide when to poll next.
+
+    Each time a poll finds new hours, the time of day they appeared is
+    recorded. The first poll of each day is made at the circular mean of those
+    times. If it finds nothing, polls follow at ADAPTIVE_MIN_INTERVAL and then
+    back off, doubling up to ADAPTIVE_MAX_INTERVAL. Once that day's data has
+    arrived, the next poll is at the next day's predicted time, so a day
+    usually costs one or two polls.
+
+    All times are passed in, as local aware datetimes, so the model can be
+    driven by a simulated clock.
+    """
+
+    def __init__(self, observations=None, max_observations=30):
+        self.observations = deque(observations or [], maxlen=max_observations)
+        self._last_poll = None
+        self._last_new = None
+        self._empty_polls = deque(maxlen=64)
+
+    @staticmethod
+    def _minute_of_day(when):
+        return when.hour * 60 + when.minute + when.second / 60
+
+    def record_poll(self, now: datetime, new_data: bool) -> None:
+        """Record the outcome of a poll made at now."""
+        if new_data:
+            gap = now - self._last_poll if self._last_poll is not None else None
+            observed = None
+            if gap is not None and gap <= timedelta(seconds=ADAPTIVE_MAX_INTERVAL):
+                # The data appeared somewhere between the previous poll and this
+                # one; longer gaps say too little about the time to be useful
+                observed = self._last_poll + gap / 2
+            elif self.window() is not None:
+                # Found by the day's first poll, so it appeared some time before
+                # now. Assuming shortly before moves the prediction earlier until
+                # a first poll misses, and the poll after it places the time again.
+                observed = now - timedelta(seconds=ADAPTIVE_MIN_INTERVAL / 2)
+            if observed is not None:
+                self.observations.append(round(self._minute_of_day(observed), 1))
+            self._last_new = now
+            self._empty_polls.clear()
+        else:
+            self._empty_polls.append(now)
+        self._last_poll = now
+
+    def window(self):
+        """Return (predicted time, spread) of publishing in minutes of day, or None."""
+        if len(self.observations) < ADAPTIVE_MIN_OBSERVATIONS:
+            return None
+        angles = [2 * math.pi * m / MINUTES_PER_DAY for m in self.observations]
+        x = sum(math.cos(a) for a in angles) / len(angles)
+        y = sum(math.sin(a) for a in angles) / len(angles)
+        centre = (math.atan2(y, x) / (2 * math.pi) * MINUTES_PER_DAY) % MINUTES_PER_DAY
+        # Circular standard deviation, in minutes
+        resultant = min(max(math.hypot(x, y), 1e-9), 1.0)
+        spread = math.sqrt(-2 * math.log(resultant)) / (2 * math.pi) * MINUTES_PER_DAY
+        return centre, spread
+
+    def next_interval(self, now: datetime) -> timedelta:
+        """How long to wait after a poll at now."""
+        window = self.window()
+        if window is None:
+            # Still learning: poll often enough that a publish time can be placed
+            return timedelta(seconds=min(SCAN_INTERVAL, ADAPTIVE_MAX_INTERVAL))
+        centre, _ = window
+        # Each cycle runs from 12 hours before one predicted time to 12 hours after
+        predicted = now.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(minutes=centre)
+        while predicted - timedelta(hours=12) > now:
+            predicted -= timedelta(days=1)
+        while predicted + timedelta(hours=12) <= now:
+            predicted += timedelta(days=1)
+
+        if self._last_new is not None and self._last_new >= predicted - timedelta(hours=12):
+            # Already have this cycle's data: wait for the next predicted time
+            return max(predicted + timedelta(days=1) - now, timedelta(minutes=1))
+        if now < predicted:
+            return max(predicted - now, timedelta(minutes=1))
+
+        # Late: the predicted time has passed without new data, so back off
+        late_polls = sum(1 for poll in self._empty_polls if poll >= predicted)
+        backoff = ADAPTIVE_MIN_INTERVAL * 2 ** max(late_polls - 1, 0)
+        return timedelta(seconds=min(backoff, ADAPTIVE_MAX_INTERVAL))
@@ -0,0 +1,334 @@
+import json
+import logging
+import re
+import time as time_module
+
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+
+from .dom import parse_html
+
+_LOGGER = logging.getLogger(__name__)
+
+XPATH_ATTRIBUTE = re.compile(r"^//(\w+)\[@([\w-]+)='([^']*)'\]$")
+CSS_SIMPLE = re.compile(r"^(\w+)?(?:\.([\w-]+))?(?:\[([\w-]+)='([^']*)'\])?$")
+
+
+def _find_all(node, by, value):
+    """Resolve the locators get_water_usage uses against a Node tree."""
+    if by == By.CLASS_NAME:
+        return node.find_all(class_name=value)
+    if by == By.ID:
+        return node.find_all(id=value)
+    if by == By.TAG_NAME:
+        return node.find_all(tag=value)
+    if by == By.LINK_TEXT:
+        return [n for n in node.find_all(tag="a") if n.text == value]
+    if by == By.CSS_SELECTOR:
+        # Comma-separated tag, .class and [attribute='value'] selectors
+        matches = []
+        for selector in value.split(","):
+            match = CSS_SIMPLE.match(selector.strip())
+            if not match or not any(match.groups()):
+                raise NotImplementedError(f"Replay does not support CSS selector {selector}")
+            tag, class_name, attribute, attribute_value = match.groups()
+            attrs = {attribute: attribute_value} if attribute else {}
+            for found in node.find_all(class_name=class_name, tag=tag, **attrs):
+                if found not in matches:
+                    matches.append(found)
+        return matches
+    if by == By.XPATH:
+        match = XPATH_ATTRIBUTE.match(value)
+        if match:
+            tag, attribute, attribute_value = match.groups()
+            # Absolute XPaths search the whole page, like Selenium does
+            root = node
+            while root.parent is not None:
+                root = root.parent
+            return root.find_all(tag=tag, **{attribute: attribute_value})
+    raise NotImplementedError(f"Replay does not support locator {by}={value}")
+
+
+def load_recording(path):
+    """Read the pages saved by RecordingDriver.save()."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["pages"]
+
+
+LOGIN_FORM = (
+    '<form><input id="username"/><input id="password" type="password"/>'
+    '<button type="submit">Log in</button></form>'
+)
+COOKIE_BANNER = '<div class="cookie-request-container">Accept</div>'
+ACCOUNT_PAGE = '<a href="/tracker">MY SMART TRACKER</a>'
+
+
+def synthetic_litres(day, hour):
+    """Litres used in an hour of a synthetic day."""
+    return (hour * 7 + day.day) % 40
+
+
+def hour_label(hour, litres):
+    """The aria-label of a Day view bar."""
+    meridiem = "am" if hour < 12 else "pm"
+    return f"Usage on {hour % 12 or 12} {meridiem} was {litres} Litres"
+
+
+def tracker_page(period_dates, labels, first=False, last=False):
+    """
+    A tracker view showing one period's bars, laid out like the portal's.
+
+    Args:
+        period_dates (str): The period-dates label.
+        labels (list): The bars' aria-labels.
+        first (bool, optional): The Previous period button is disabled.
+        last (bool, optional): The Next period button is disabled.
+    """
+    # Imported here to avoid a circular import with stw_consumption
+    from .stw_consumption import NEXT_PERIOD, PREVIOUS_PERIOD
+
+    def arrow(label, disabled):
+        state = ' class="period-arrow disabled" disabled' if disabled else ' class="period-arrow"'
+        return f'<button aria-label="{label}"{state}></button>'
+
+    rects = "".join(f'<rect aria-label="{label}"/>' for label in labels)
+    return (
+        '<div class="consumption-history">'
+        '<button class="button-reset">Day</button><button class="button-reset">Week</button>'
+        '<button class="button-reset">Month</button>'
+        f"{arrow(PREVIOUS_PERIOD, first)}"
+        f'<p class="period-dates">{period_dates}</p>'
+        f"{arrow(NEXT_PERIOD, last)}"
+        '<svg class="recharts-surface">'
+        f'<g class="recharts-layer recharts-customized-wrapper">{rects}</g>'
+        "</svg></div>"
+    )
+
+
+def day_page(day, first=False, last=False):
+    """A Day view of synthetic_litres usage."""
+    labels = [hour_label(hour, synthetic_litres(day, hour)) for hour in range(24)]
+    return tracker_page(f"{day:%A} {day.day} {day:%B}", labels, first, last)
+
+
+def synthetic_pages(days):
+    """
+    The pages a fresh get_water_usage steps through, in order.
+
+    Args:
+        days (list): The dates the Day view offers, oldest first; it opens on the oldest.
+    """
+    last = len(days) - 1
+    return [
+        f"{COOKIE_BANNER}{LOGIN_FORM}",
+        LOGIN_FORM,
+        ACCOUNT_PAGE,
+        day_page(days[0], True, last == 0),
+        *(day_page(day, i == 0, i == last) for i, day in enumerate(days)),
+    ]
+
+
+class RecordingDriver:
+    """Wrap a real driver and keep a page snapshot for every step.
+
+    A step is a get() or a click(). The snapshot for a step is taken just
+    before the next step (or on save), so it holds the page as the fetch saw
+    it after its waits completed.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self.pages = []
+        self._stepped = False
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def _before_step(self):
+        if self._stepped:
+            self.pages.append(self._driver.page_source)
+        self._stepped = True
+
+    def get(self, url):
+        self._before_step()
+        return self._driver.get(url)
+
+    def find_element(self, by=By.ID, value=None):
+        return RecordingElement(self, self._driver.find_element(by, value))
+
+    def find_elements(self, by=By.ID, value=None):
+        return [RecordingElement(self, e) for e in self._driver.find_elements(by, value)]
+
+    def execute_script(self, script, *args):
+        args = [a._element if isinstance(a, RecordingElement) else a for a in args]
+        return self._driver.execute_script(script, *args)
+
+    def save(self, path):
+        """Write the recording to a JSON file."""
+        pages = list(self.pages)
+        if self._stepped:
+            pages.append(self._driver.page_source)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"pages": pages}, f)
+        _LOGGER.debug("Saved %d recorded pages to %s", len(pages), path)
+
+
+class RecordingElement:
+    """WebElement wrapper that records a snapshot before clicks."""
+
+    def __init__(self, recorder, element):
+        self._recorder = recorder
+        self._element = element
+
+    def __getattr__(self, name):
+        return getattr(self._element, name)
+
+    @property
+    def parent(self):
+        return self._recorder
+
+    def click(self):
+        self._recorder._before_step()
+        return self._element.click()
+
+    def find_element(self, by=By.ID, value=None):
+        return RecordingElement(self._recorder, self._element.find_element(by, value))
+
+    def find_elements(self, by=By.ID, value=None):
+        return [RecordingElement(self._recorder, e) for e in self._element.find_elements(by, value)]
+
+
+class ReplayDriver:
+    """A fake remote WebDriver that serves recorded pages.
+
+    Every WebDriver command is counted and delayed by latency seconds to model
+    the HTTP round trip to a remote grid. get() and click() move to the next
+    recorded page. Commands whose number is in faults raise a WebDriverException,
+    to exercise the retry handling.
+    """
+
+    def __init__(self, pages, latency=0.0, faults=()):
+        self._pages = list(pages)
+        self._index = -1
+        self._root = parse_html("")
+        self.latency = latency
+        self.faults = set(faults)
+        self.commands = 0
+        self.current_url = "about:blank"
+
+    @classmethod
+    def from_file(cls, path, latency=0.0):
+        return cls(load_recording(path), latency)
+
+    def _command(self):
+        self.commands += 1
+        if self.commands in self.faults:
+            raise WebDriverException(f"Injected fault at command {self.commands}")
+        if self.latency:
+            time_module.sleep(self.latency)
+
+    def _advance(self):
+        if self._index + 1 < len(self._pages):
+            self._index += 1
+            self._root = parse_html(self._pages[self._index])
+
+    def get(self, url):
+        self._command()
+        self.current_url = url
+        self._advance()
+
+    @property
+    def page_source(self):
+        self._command()
+        return self._pages[self._index] if self._index >= 0 else ""
+
+    def find_element(self, by=By.ID, value=None):
+        return self._find(self._root, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        self._command()
+        return [ReplayElement(self, n) for n in _find_all(self._root, by, value)]
+
+    def _find(self, node, by, value):
+        self._command()
+        matches = _find_all(node, by, value)
+        if not matches:
+            raise NoSuchElementException(f"{by}={value}")
+        return ReplayElement(self, matches[0])
+
+    def execute_script(self, script, *args):
+        # Imported here to avoid a circular import with stw_consumption
+        from .stw_consumption import EXTRACT_HOURLY_SCRIPT
+
+        self._command()
+        if script == EXTRACT_HOURLY_SCRIPT:
+            # A Python copy of the script; tests check it against Node.js
+            root = args[0]._node
+            dates = root.find("period-dates")
+            surface = root.find("recharts-surface")
+            if dates is None or surface is None:
+                return [dates.text if dates is not None else None, None]
+            labels = []
+            for wrapper in surface.find_all("recharts-layer.recharts-customized-wrapper"):
+                labels.extend(
+                    r.get_attribute("aria-label")
+                    for r in wrapper.find_all(tag="rect")
+                    if r.get_attribute("aria-label")
+                )
+            return [dates.text, labels]
+        if "userAgent" in script:
+            return "replay"
+        if "performance.getEntriesByType" in script:
+            return []
+        if "readyState" in script:
+            return "complete"
+        raise NotImplementedError("Replay does not support this script")
+
+    def get_cookies(self):
+        self._command()
+        return []
+
+    def quit(self):
+        self._command()
+
+
+class ReplayElement:
+    """An element of a recorded page."""
+
+    def __init__(self, driver, node):
+        self.parent = driver
+        self._node = node
+
+    @property
+    def text(self):
+        self.parent._command()
+        return self._node.text
+
+    def get_attribute(self, name):
+        self.parent._command()
+        return self._node.get_attribute(name)
+
+    def is_enabled(self):
+        self.parent._command()
+        return "disabled" not in self._node.attrs
+
+    def is_displayed(self):
+        self.parent._command()
+        return True
+
+    def click(self):
+        self.parent._command()
+        self.parent._advance()
+
+    def clear(self):
+        self.parent._command()
+
+    def send_keys(self, *value):
+        self.parent._command()
+
+    def find_element(self, by=By.ID, value=None):
+        return self.parent._find(self._node, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        self.parent._command()
+        return [ReplayElement(self.parent, n) for n in _find_all(self._node, by, value)]
@@ -0,0 +1,73 @@
+import random
+
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    SessionNotCreatedException,
+)
+from urllib3.exceptions import HTTPError
+
+from .const import RETRY_BACKOFF, RETRY_MAX_DELAY
+
+# How a failed fetch attempt is handled
+ERROR_AUTH = "auth"  # credentials rejected: retrying cannot help
+ERROR_LAYOUT = "layout"  # the portal's pages no longer look as expected
+ERROR_SESSION = "session"  # the browser session or grid connection is gone: start a new one
+ERROR_UNANSWERED = "unanswered"  # a submitted log-in got no answer: retrying would submit the password again
+ERROR_TRANSIENT = "transient"  # slow or half-loaded page: resume in the same session
+
+
+class LoginFailedError(Exception):
+    """The portal rejected the username or password."""
+
+
+class LoginUnansweredError(Exception):
+    """The portal did not answer a submitted log-in in time."""
+
+
+class PortalChangedError(ValueError):
+    """A portal page loaded but is missing the elements the scraper looks for."""
+
+
+class SeleniumUnavailableError(Exception):
+    """No browser session could be started on the Selenium URL."""
+
+
+def classify_error(err):
+    """
+    Decide how a failed fetch attempt should be retried.
+
+    Args:
+        err (Exception): The error the attempt raised.
+
+    Returns:
+        str: One of ERROR_AUTH, ERROR_LAYOUT, ERROR_SESSION, ERROR_UNANSWERED or ERROR_TRANSIENT.
+    """
+    if isinstance(err, LoginFailedError):
+        return ERROR_AUTH
+    if isinstance(err, LoginUnansweredError):
+        return ERROR_UNANSWERED
+    if isinstance(err, (NoSuchElementException, ValueError)):
+        # Elements are only looked up after waiting for them, and ValueError
+        # comes from labels that no longer parse
+        return ERROR_LAYOUT
+    if isinstance(
+        err,
+        (
+            InvalidSessionIdException,
+            NoSuchWindowException,
+            SessionNotCreatedException,
+            SeleniumUnavailableError,
+            HTTPError,
+            OSError,
+        ),
+    ):
+        return ERROR_SESSION
+    return ERROR_TRANSIENT
+
+
+def retry_delay(attempt, rng=random.random):
+    """Exponential backoff with jitter: between half and all of RETRY_BACKOFF * 2^(attempt - 1), capped."""
+    delay = min(RETRY_BACKOFF * 2 ** (attempt - 1), RETRY_MAX_DELAY)
+    return delay / 2 + rng() * delay / 2
@@ -0,0 +1,206 @@
+import asyncio
+import logging
+import random
+import time
+import weakref
+from collections import deque
+from functools import partial
+from contextlib import asynccontextmanager
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN, MAX_SESSIONS_PER_GRID, REFRESH_JITTER, SESSION_IDLE_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_SCHEDULER = "scheduler"
+DATA_HANDOFF = "handoff"
+DATA_SINGLE_FLIGHT = "single_flight"
+
+
+class _GridQueue:
+    """Concurrency limit and wait statistics for one Selenium URL."""
+
+    def __init__(self, limit):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.limit = limit
+        self.waiting = 0
+        self.active = 0
+        self.waits = deque(maxlen=50)
+        # Every entry's DriverPool on this grid, whose idle sessions also take room
+        self.pools = weakref.WeakSet()
+
+
+class FetchScheduler:
+    """Limit concurrent browser sessions per Selenium grid across all entries."""
+
+    def __init__(self, limit=MAX_SESSIONS_PER_GRID, jitter=REFRESH_JITTER):
+        self._limit = limit
+        self._jitter = jitter
+        self._grids = {}
+
+    def _grid(self, selenium_url):
+        if selenium_url not in self._grids:
+            self._grids[selenium_url] = _GridQueue(self._limit)
+        return self._grids[selenium_url]
+
+    def add_pool(self, selenium_url, pool):
+        """Count a DriverPool's idle sessions against its grid's limit."""
+        self._grid(selenium_url).pools.add(pool)
+
+    @asynccontextmanager
+    async def slot(self, selenium_url, name, jitter=True, pool=None):
+        """
+        Wait for a free browser slot on a grid.
+
+        Idle sessions kept in other pools on the grid are quit if the session
+        about to start would not fit alongside them.
+
+        Args:
+            selenium_url (str): The grid the session will run on.
+            name (str): Who is waiting, for logging.
+            jitter (bool, optional): Sleep a random delay first so timers that fire together spread out.
+            pool (DriverPool, optional): The pool the session will come from.
+        """
+        if jitter and self._jitter:
+            delay = random.uniform(0, self._jitter)
+            _LOGGER.debug("Delaying %s fetch by %.1f seconds", name, delay)
+            await asyncio.sleep(delay)
+        grid = self._grid(selenium_url)
+        grid.waiting += 1
+        queued_at = time.monotonic()
+        try:
+            await grid.semaphore.acquire()
+        finally:
+            grid.waiting -= 1
+        wait = time.monotonic() - queued_at
+        grid.waits.append(wait)
+        grid.active += 1
+        _LOGGER.debug("%s got a browser slot after %.1f seconds", name, wait)
+        try:
+            if pool is None or not pool.idle_count:
+                await self._make_room(grid, pool, name)
+            yield
+        finally:
+            grid.active -= 1
+            grid.semaphore.release()
+
+    @staticmethod
+    async def _make_room(grid, pool, name):
+        """Quit other pools' idle sessions until a new session fits on the grid."""
+        others = [p for p in grid.pools if p is not pool and p.idle_count]
+        excess = grid.active + sum(p.idle_count for p in others) - grid.limit
+        loop = asyncio.get_running_loop()
+        for other in others:
+            if excess <= 0:
+                break
+            _LOGGER.debug("Quitting an idle session to make room for %s", name)
+            excess -= other.idle_count
+            await loop.run_in_executor(None, other.evict_idle, 0)
+
+    def diagnostics(self):
+        """Queue state and recent wait times per grid."""
+        return {
+            url: {
+                "limit": grid.limit,
+                "active": grid.active,
+                "waiting": grid.waiting,
+                "recent_waits": [round(w, 3) for w in grid.waits],
+                "max_wait": round(max(grid.waits), 3) if grid.waits else None,
+            }
+            for url, grid in self._grids.items()
+        }
+
+
+class SingleFlight:
+    """Run at most one fetch per account at a time and share it with concurrent callers.
+
+    A refresh that is triggered while the same account's fetch is running
+    waits for that fetch and gets its result (or exception) instead of
+    starting another browser session. Calls are keyed by config entry ID, and
+    an entry cancels its call when it unloads so a reloaded entry never joins
+    the fetch of the coordinator it replaced.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def run(self, key, func):
+        """
+        Run func() unless a call for key is already in flight, and return its result.
+
+        Args:
+            key (str): The config entry the work is for.
+            func (callable): Coroutine function doing the work.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            task.add_done_callback(partial(self._done, key))
+        else:
+            _LOGGER.debug("Joining the fetch already running for %s", key)
+        # One caller being cancelled must not cancel the others' fetch
+        return await asyncio.shield(task)
+
+    def _done(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def cancel(self, key):
+        """Cancel and forget the call in flight for key, so later calls start afresh."""
+        task = self._tasks.pop(key, None)
+        if task is not None and not task.done():
+            _LOGGER.debug("Cancelling the fetch running for %s", key)
+            task.cancel()
+
+    def diagnostics(self):
+        return sorted(self._tasks)
+
+
+def get_scheduler(hass: HomeAssistant) -> FetchScheduler:
+    """Return the domain-wide fetch scheduler, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_SCHEDULER not in domain_data:
+        domain_data[DATA_SCHEDULER] = FetchScheduler()
+    return domain_data[DATA_SCHEDULER]
+
+
+def get_single_flight(hass: HomeAssistant) -> SingleFlight:
+    """Return the domain-wide single-flight fetch registry, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_SINGLE_FLIGHT not in domain_data:
+        domain_data[DATA_SINGLE_FLIGHT] = SingleFlight()
+    return domain_data[DATA_SINGLE_FLIGHT]
+
+
+@callback
+def hand_off_pool(hass: HomeAssistant, account, pool):
+    """
+    Keep the sessions a config flow logged in for the account's coordinator.
+
+    The coordinator takes the pool when its entry is set up, so its first
+    refresh does not log in again. Pools nobody takes are closed after
+    SESSION_IDLE_TTL.
+
+    Args:
+        hass (HomeAssistant): Home Assistant.
+        account (str): The config entry's unique ID.
+        pool (DriverPool): The pool holding the logged-in session.
+    """
+    handoff = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_HANDOFF, {})
+    handoff[account] = pool
+
+    @callback
+    def _expire(_now):
+        if handoff.get(account) is pool:
+            del handoff[account]
+            hass.async_add_executor_job(pool.close)
+
+    async_call_later(hass, SESSION_IDLE_TTL, _expire)
+
+
+def take_handed_off_pool(hass: HomeAssistant, account):
+    """Return the pool a config flow left for account, or None."""
+    return hass.data.get(DOMAIN, {}).get(DATA_HANDOFF, {}).pop(account, None)
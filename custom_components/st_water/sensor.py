@@ -0,0 +1,151 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime, UnitOfVolume
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN, MANUFACTURER, MODEL
+from .coordinator import STWaterMeterUpdateCoordinator
+
+
+@dataclass(frozen=True, kw_only=True)
+class STWaterSensorEntityDescription(SensorEntityDescription):
+    """Describes an ST Water sensor."""
+
+    value_fn: Callable[[STWaterMeterUpdateCoordinator], Any]
+
+
+def _last_fetch(key, default=None):
+    def value(coordinator):
+        fetch = coordinator.last_fetch
+        return fetch.get(key, default) if fetch else None
+
+    return value
+
+
+def _last_phase(phase):
+    def value(coordinator):
+        fetch = coordinator.last_fetch
+        return fetch["phases"].get(phase) if fetch else None
+
+    return value
+
+
+# Usage derived from the hourly rows as they are written
+USAGE_SENSORS: tuple[STWaterSensorEntityDescription, ...] = (
+    STWaterSensorEntityDescription(
+        key="day_total",
+        name="Latest day consumption",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        value_fn=lambda coordinator: coordinator.derived.day_total,
+    ),
+    STWaterSensorEntityDescription(
+        key="week_total",
+        name="Last 7 days consumption",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        value_fn=lambda coordinator: coordinator.derived.week_total,
+    ),
+    STWaterSensorEntityDescription(
+        key="overnight_minimum",
+        name="Overnight minimum hourly use",
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.derived.overnight_minimum,
+    ),
+    STWaterSensorEntityDescription(
+        key="nonzero_hours",
+        name="Consecutive hours of use",
+        native_unit_of_measurement=UnitOfTime.HOURS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.derived.nonzero_hours,
+    ),
+)
+
+# Fetch telemetry, disabled by default so they only exist for those who want them
+DIAGNOSTIC_SENSORS: tuple[STWaterSensorEntityDescription, ...] = (
+    STWaterSensorEntityDescription(
+        key="fetch_duration",
+        name="Last fetch duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_fetch("duration"),
+    ),
+    STWaterSensorEntityDescription(
+        key="login_duration",
+        name="Last login duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_phase("login"),
+    ),
+    STWaterSensorEntityDescription(
+        key="webdriver_commands",
+        name="Last fetch WebDriver commands",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_fetch("webdriver_commands"),
+    ),
+    STWaterSensorEntityDescription(
+        key="fetch_retries",
+        name="Last fetch retries",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=_last_fetch("retries"),
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the usage and diagnostic sensors."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        STWaterSensor(coordinator, entry, description)
+        for description in (*USAGE_SENSORS, *DIAGNOSTIC_SENSORS)
+    )
+
+
+class STWaterSensor(CoordinatorEntity[STWaterMeterUpdateCoordinator], SensorEntity):
+    """A sensor reading from the coordinator."""
+
+    entity_description: STWaterSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: STWaterMeterUpdateCoordinator,
+        entry: ConfigEntry,
+        description: STWaterSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            manufacturer=MANUFACTURER,
+            model=MODEL,
+            name=entry.title,
+        )
+
+    @property
+    def native_value(self):
+        return self.entity_description.value_fn(self.coordinator)
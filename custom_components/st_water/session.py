@@ -0,0 +1,104 @@
+import logging
+import threading
+import time as time_module
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DriverPool:
+    """Keep remote WebDriver sessions alive between refreshes.
+
+    Drivers are handed out by acquire() and given back with release(). An idle
+    driver is reused while it is younger than idle_ttl and still answers a
+    cheap command; otherwise it is quit and a new one is created.
+    """
+
+    def __init__(self, factory, idle_ttl, clock=time_module.monotonic):
+        """
+        Args:
+            factory (callable): Creates a new driver, e.g. a partial of create_driver.
+            idle_ttl (float): Seconds an unused driver is kept before it is quit.
+            clock (callable, optional): Monotonic time source.
+        """
+        self._factory = factory
+        self._idle_ttl = idle_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle = []  # [(driver, released_at)]
+        self._in_use = set()
+        self.sessions_created = 0
+
+    def acquire(self):
+        """Return a healthy driver, reusing an idle one when possible (blocking)."""
+        self.evict_idle()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                driver, _ = self._idle.pop()
+            if self._is_healthy(driver):
+                _LOGGER.debug("Reusing pooled WebDriver session")
+                with self._lock:
+                    self._in_use.add(driver)
+                return driver
+            _LOGGER.debug("Pooled WebDriver session is dead, replacing it")
+            self._quit(driver)
+
+        driver = self._factory()
+        with self._lock:
+            self.sessions_created += 1
+            self._in_use.add(driver)
+        return driver
+
+    def release(self, driver, reusable=True):
+        """Give a driver back to the pool, or quit it if it should not be reused."""
+        with self._lock:
+            self._in_use.discard(driver)
+            if reusable and self._idle_ttl > 0:
+                self._idle.append((driver, self._clock()))
+                return
+        self._quit(driver)
+
+    def discard(self, driver):
+        """Quit a driver that has crashed or been cancelled."""
+        self.release(driver, reusable=False)
+
+    def evict_idle(self, max_age=None):
+        """Quit idle drivers older than max_age seconds, by default the TTL."""
+        max_age = self._idle_ttl if max_age is None else max_age
+        now = self._clock()
+        with self._lock:
+            expired = [d for d, t in self._idle if now - t >= max_age]
+            self._idle = [(d, t) for d, t in self._idle if now - t < max_age]
+        for driver in expired:
+            _LOGGER.debug("Evicting idle WebDriver session")
+            self._quit(driver)
+
+    def close(self):
+        """Quit every driver the pool knows about."""
+        with self._lock:
+            drivers = [d for d, _ in self._idle] + list(self._in_use)
+            self._idle = []
+            self._in_use = set()
+        for driver in drivers:
+            self._quit(driver)
+
+    @property
+    def idle_count(self):
+        with self._lock:
+            return len(self._idle)
+
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.current_url
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except Exception as err:
+            _LOGGER.warning("Error closing Chrome driver: %s", err)
@@ -1,27 +1,128 @@
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import date, datetime
+import hashlib
 import logging
 import os
 import re
 import time as time_module
+import homeassistant.util.dt as dt_util
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from .const import LOGIN_PAGE, DEBUG_MODE
+from .chart_capture import capture_chart_data, release_proxy_port, reserve_proxy_port
+from .fetch_control import FetchCancelledError, FetchControl
+from .retry import (
+    ERROR_AUTH,
+    ERROR_LAYOUT,
+    ERROR_SESSION,
+    ERROR_UNANSWERED,
+    LoginFailedError,
+    LoginUnansweredError,
+    PortalChangedError,
+    SeleniumUnavailableError,
+    classify_error,
+    retry_delay,
+)
+from .const import (
+    LOGIN_PAGE,
+    DEBUG_MODE,
+    EXTRACTION_MODE,
+    CAPTURE_CHART_JSON,
+    CAPTURE_PROXY_HOST,
+    FETCH_RETRIES,
+    LEAN_BROWSER,
+    BROWSER_WINDOW_SIZE,
+    BLOCKED_HOSTS,
+)
+from .dom import parse_html
 
 _LOGGER = logging.getLogger(__name__)
 
-
-def extract_hourly_data(consumption_history):
+CAPTURE_ENABLED = CAPTURE_CHART_JSON and CAPTURE_PROXY_HOST is not None
+
+# Reads the period date and every usage label in a single WebDriver round trip.
+# Mirrors the element walk in _extract_hourly_data_elements exactly; a missing
+# element comes back as null.
+EXTRACT_HOURLY_SCRIPT = """
+const root = arguments[0];
+const dates = root.querySelector('.period-dates');
+const surface = root.querySelector('.recharts-surface');
+if (!dates || !surface) return [dates ? dates.innerText.trim() : null, null];
+const labels = [];
+surface.querySelectorAll('.recharts-layer.recharts-customized-wrapper').forEach(wrapper => {
+    wrapper.querySelectorAll('rect').forEach(rect => {
+        const label = rect.getAttribute('aria-label');
+        if (label) labels.push(label);
+    });
+});
+return [dates.innerText.trim(), labels];
+"""
+
+
+def extract_hourly_data(consumption_history, mode=None):
     """
     Extract hourly water usage data from the current view.
 
     Args:
         consumption_history (WebElement): The parent element containing consumption data.
+        mode (str, optional): "script", "page_source" or "element". Defaults to EXTRACTION_MODE.
 
     Returns:
         dict: A dictionary with the date as the key and hourly usage data as the value.
+
+    Raises:
+        NoSuchElementException: The period dates or the chart are missing, in every mode.
     """
+    mode = mode or EXTRACTION_MODE
+    if mode == "script":
+        period_dates, day_data = consumption_history.parent.execute_script(
+            EXTRACT_HOURLY_SCRIPT, consumption_history
+        )
+        if period_dates is None:
+            raise NoSuchElementException("period-dates not found in consumption history")
+        if day_data is None:
+            raise NoSuchElementException("recharts-surface not found in consumption history")
+        return {period_dates: list(day_data)}
+    if mode == "page_source":
+        return extract_hourly_data_from_html(consumption_history.parent.page_source)
+    return _extract_hourly_data_elements(consumption_history)
+
+
+def extract_hourly_data_from_html(page_source):
+    """
+    Extract hourly water usage data from a saved page snapshot.
+
+    Args:
+        page_source (str): HTML of the tracker page, e.g. driver.page_source.
+
+    Returns:
+        dict: A dictionary with the date as the key and hourly usage data as the value.
+
+    Raises:
+        NoSuchElementException: The period dates or the chart are missing.
+    """
+    root = parse_html(page_source)
+    consumption_history = root.find("consumption-history") or root
+    period_dates = consumption_history.find("period-dates")
+    if period_dates is None:
+        raise NoSuchElementException("period-dates not found in page source")
+    chart_surface = consumption_history.find("recharts-surface")
+    if chart_surface is None:
+        raise NoSuchElementException("recharts-surface not found in page source")
+    day_data = []
+    for usage_data_wrapper in chart_surface.find_all(
+        "recharts-layer.recharts-customized-wrapper"
+    ):
+        for usage_element in usage_data_wrapper.find_all(tag="rect"):
+            usage = usage_element.get_attribute("aria-label")
+            if usage:
+                day_data.append(usage)
+    return {period_dates.text: day_data}
+
+
+def _extract_hourly_data_elements(consumption_history):
+    """Extract hourly data with one WebDriver call per element."""
     # Extract the date
     period_dates = consumption_history.find_element(By.CLASS_NAME, "period-dates").text
 
@@ -62,13 +163,512 @@ def parse_date(date_str, year):
     return dt.strftime("%Y-%m-%d")
 
 
-def get_water_usage(username=None, password=None, selenium_url=None):
+PERIOD_USAGE_PATTERN = re.compile(r"Usage (?:on|in) (.+?) was (\d+) Litres")
+YEAR_PATTERN = re.compile(r"\b(\d{4})\b")
+DAY_FORMATS = ("%A %d %B", "%a %d %B", "%d %B", "%A %d %b", "%a %d %b", "%d %b")
+MONTH_FORMATS = ("%B", "%b")
+
+
+def _parse_period_label(usage_str, view):
+    """Return (month, day, year or None, litres) for a Week or Month bar label, or None."""
+    match = PERIOD_USAGE_PATTERN.match(usage_str)
+    if not match:
+        return None
+    label, value = match.groups()
+    label_year = YEAR_PATTERN.search(label)
+    if label_year:
+        label = YEAR_PATTERN.sub("", label).strip()
+    formats = DAY_FORMATS if view == "Week" else MONTH_FORMATS
+    for fmt in formats:
+        try:
+            # A leap year, so that 29 February parses
+            parsed = datetime.strptime(f"{label} 2000", f"{fmt} %Y")
+        except ValueError:
+            continue
+        return parsed.month, parsed.day, int(label_year.group(1)) if label_year else None, int(value)
+    return None
+
+
+def parse_period_usage(labels, view, period_dates=None, today=None):
+    """
+    Parse the bar labels of one Week or Month view period.
+
+    The bars run oldest first and most labels have no year. The last bar is
+    in the last year period_dates shows, or is the most recent occurrence of
+    its date if it shows none. Each earlier bar is in the same year as the
+    bar after it, or the year before where the dates go backwards, as with
+    December before January.
+
+    Args:
+        labels (list): The bars' aria-labels, e.g. "Usage on Monday 12 May was 300 Litres".
+        view (str): "Week" for daily bars or "Month" for monthly bars.
+        period_dates (str, optional): The period-dates label, e.g. "February 2025 - January 2026".
+        today (date, optional): Reference date when no year is shown.
+
+    Returns:
+        dict: {"YYYY-MM-DD" of the day or first of the month: litres}, oldest first
+    """
+    bars = [bar for bar in (_parse_period_label(label, view) for label in labels) if bar]
+    today = today or datetime.now().date()
+    hint_years = YEAR_PATTERN.findall(period_dates or "")
+    usage = {}
+    year = None
+    following = None
+    for month, day, label_year, value in reversed(bars):
+        if label_year:
+            year = label_year
+        elif year is None:
+            if hint_years:
+                year = int(hint_years[-1])
+            else:
+                year = today.year if (month, day) <= (today.month, today.day) else today.year - 1
+        elif (month, day) > following:
+            year -= 1
+        following = (month, day)
+        try:
+            usage[date(year, month, day).isoformat()] = value
+        except ValueError:
+            # 29 February outside a leap year: the year worked out is wrong
+            _LOGGER.debug("Ignoring %s %s in %s", day, month, year)
+    return dict(reversed(usage.items()))
+
+
+def period_to_iso_date(day):
+    """Convert a period-dates label such as "Monday 12 May" to YYYY-MM-DD."""
+    # The date data from ST Water does not have a year. The day data is roughly from the last 8 days so it only matters near the start of a new year.
+    # If the month is January and the day is December, we need to subtract 1 from the year.
+    # This is a bit of a hack but it probably works for the current setup.
+    year = datetime.now().year
+    month = datetime.now().month
+    if month == 1 and "December" in day:
+        year -= 1
+    return parse_date(day, year)
+
+
+# Where the log-in page shows why it rejected the credentials
+LOGIN_ERROR_SELECTOR = "[role='alert'], .error-message, .field-validation-error, .validation-summary-errors"
+
+NEXT_PERIOD = "Next period range"
+PREVIOUS_PERIOD = "Previous period range"
+
+
+@dataclass(frozen=True)
+class TrackerProbe:
+    """What the tracker landing view shows, read before committing to a full fetch.
+
+    newest is True only when the view's Next period button is disabled, i.e.
+    nothing newer can exist than what it shows.
+    """
+
+    signature: str
+    latest_day: str | None = None
+    latest_hour: int | None = None
+    newest: bool = False
+
+
+def probe_tracker(driver):
+    """
+    Read the latest period and last populated bar on the current tracker view.
+
+    Costs one extraction of the view that is already on screen and a look at
+    its Next period button, with no clicks, so it can decide whether the Day
+    walk is needed at all.
+
+    Args:
+        driver (WebDriver): A driver showing the loaded tracker.
+
+    Returns:
+        TrackerProbe: A signature of the view plus the newest day and hour it shows, where known.
+    """
+    consumption_history = driver.find_element(By.CLASS_NAME, "consumption-history")
+    period_dates, labels = next(iter(extract_hourly_data(consumption_history).items()))
+    signature = hashlib.sha1(
+        "\n".join([period_dates, *labels]).encode("utf-8")
+    ).hexdigest()
+    next_buttons = consumption_history.find_elements(
+        By.XPATH, f"//button[@aria-label='{NEXT_PERIOD}']"
+    )
+    newest = bool(next_buttons) and _is_disabled(next_buttons[0])
+
+    hours = [int(hour[:2]) for hour, _ in map(parse_usage, labels) if hour]
+    if hours:
+        try:
+            latest_day = period_to_iso_date(period_dates)
+        except ValueError:
+            latest_day = None
+        return TrackerProbe(signature, latest_day, max(hours) if latest_day else None, newest)
+
+    # Not an hourly view: fall back to the newest daily bar
+    days = list(parse_period_usage(labels, "Week", period_dates))
+    return TrackerProbe(signature, max(days) if days else None, newest=newest)
+
+
+def _add_lean_options(options):
+    """Stop Chrome fetching what the scraper never looks at."""
+    options.page_load_strategy = "eager"
+    options.add_argument(f"--window-size={BROWSER_WINDOW_SIZE}")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--disable-remote-fonts")
+    options.add_experimental_option(
+        "prefs", {"profile.managed_default_content_settings.images": 2}
+    )
+    if BLOCKED_HOSTS:
+        rules = ", ".join(
+            f"MAP {pattern} ~NOTFOUND"
+            for host in BLOCKED_HOSTS
+            for pattern in (host, f"*.{host}")
+        )
+        options.add_argument(f"--host-resolver-rules={rules}")
+
+
+def create_driver(selenium_url, capture=False):
+    """Start a remote Chrome session, optionally behind the selenium-wire proxy."""
+    options = webdriver.ChromeOptions()
+    if not DEBUG_MODE:
+        options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    if LEAN_BROWSER:
+        _add_lean_options(options)
+    else:
+        options.add_argument("--start-maximized")
+    if not capture:
+        return webdriver.Remote(command_executor=selenium_url, options=options)
+
+    # Imported lazily: selenium-wire starts a proxy and is only needed here.
+    from seleniumwire import webdriver as wire_webdriver
+
+    port = reserve_proxy_port()
+    options.add_argument(f"--proxy-server={CAPTURE_PROXY_HOST}:{port}")
+    options.add_argument("--ignore-certificate-errors")
+    try:
+        driver = wire_webdriver.Remote(
+            command_executor=selenium_url,
+            options=options,
+            seleniumwire_options={
+                "auto_config": False,
+                "addr": "0.0.0.0",
+                "port": port,
+            },
+        )
+    except Exception:
+        release_proxy_port(port)
+        raise
+    quit_driver = driver.quit
+
+    def quit_and_release():
+        # The proxy stops with the driver, so its port is free again
+        try:
+            quit_driver()
+        finally:
+            release_proxy_port(port)
+
+    driver.quit = quit_and_release
+    driver.scopes = [r".*stwater\.co\.uk.*"]
+    return driver
+
+
+def _switch_view(driver, control, label):
+    """Click one of the Day/Week/Month period buttons on the tracker."""
+    consumption_history = driver.find_element(
+        By.CLASS_NAME, "consumption-history"
+    )
+    control.wait(
+        consumption_history,
+        EC.presence_of_element_located((By.CLASS_NAME, "button-reset"))
+    )
+    _LOGGER.debug("Change to %s view", label)
+    period_buttons = consumption_history.find_elements(
+        By.CLASS_NAME, "button-reset"
+    )
+    for period_button in period_buttons:
+        if period_button.text == label:
+            period_button.click()
+            return
+    raise ValueError(f"No {label} button on the tracker")
+
+
+def _is_disabled(button):
+    """Return True if a period button is disabled."""
+    return "disabled" in (button.get_attribute("class") or "") or not button.is_enabled()
+
+
+def _step_period(driver, control, consumption_history, aria_label, current_date):
+    """Click the next/previous period button and wait for the date to change.
+
+    Returns False without clicking if the button is disabled.
+    """
+    button = consumption_history.find_element(
+        By.XPATH, f"//button[@aria-label='{aria_label}']"
+    )
+    if _is_disabled(button):
+        return False
+    button.click()
+    control.wait(
+        driver,
+        lambda d: d.find_element(By.CLASS_NAME, "period-dates").text
+        != current_date
+    )
+    return True
+
+
+def _login(driver, username, password, start_time, control):
+    """Log in unless the session already is, and return the tracker link."""
+    _LOGGER.debug("Getting log-in page")
+    with control.metrics.phase("page_load"):
+        driver.get(LOGIN_PAGE)
+    _LOGGER.debug("Got log-in page")
+
+    # A pooled session that is still logged in goes straight to the account page
+    control.wait(
+        driver,
+        EC.any_of(
+            EC.presence_of_element_located((By.ID, "username")),
+            EC.presence_of_element_located((By.LINK_TEXT, "MY SMART TRACKER")),
+        )
+    )
+    tracker_links = driver.find_elements(By.LINK_TEXT, "MY SMART TRACKER")
+    if tracker_links:
+        _LOGGER.debug("Session is already logged in")
+        return tracker_links[0]
+
+    # Wait for cookie popup with better error handling
+    with control.metrics.phase("cookie_popup"):
+        try:
+            _LOGGER.debug("Waiting for cookie popup")
+            cookie_popup = control.wait(
+                driver,
+                EC.element_to_be_clickable(
+                    (By.CLASS_NAME, "cookie-request-container")
+                ),
+                timeout=10,
+            )
+            _LOGGER.debug("Found cookie popup, clicking")
+            cookie_popup.click()
+            _LOGGER.debug(
+                "Cookie popup handled at %.2f seconds",
+                time_module.time() - start_time,
+            )
+        except Exception as e:
+            _LOGGER.warning("Cookie popup handling failed: %s", str(e))
+            # Continue anyway as the cookie popup might not appear
+
+    # Wait for login form with explicit element checks
+    _LOGGER.debug("Waiting for login form")
+    username_field = control.wait(
+        driver,
+        EC.presence_of_element_located((By.ID, "username"))
+    )
+    password_field = control.wait(
+        driver,
+        EC.presence_of_element_located((By.ID, "password"))
+    )
+
+    # Clear fields first
+    username_field.clear()
+    password_field.clear()
+
+    # Type credentials with explicit waits
+    _LOGGER.debug("Entering credentials")
+    _LOGGER.debug("username: %s", username)
+    _LOGGER.debug("password: %s", "*" * len(password))
+    control.sleep(1)  # Small delay before typing
+    username_field.send_keys(username)
+    control.sleep(1)  # Small delay between fields
+    password_field.send_keys(password)
+    control.sleep(1)  # Small delay before submit
+
+    # Find and click the login button instead of using RETURN key
+    _LOGGER.debug("Clicking login button")
+    login_button = control.wait(
+        driver,
+        EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
+    )
+    login_button.click()
+
+    # Wait for successful login, or for the portal to say why not. A slow grid
+    # must not use up the log-in phase and look like a rejection, so this wait
+    # has a deadline of its own.
+    _LOGGER.debug("Waiting for login to complete")
+    control.start_phase("login_submit")
+    try:
+        outcome = control.wait(driver, _login_outcome)
+    except TimeoutException as e:
+        # The log-in may still go through, and trying again would submit the
+        # password a second time, which the portal can count as a failure
+        raise LoginUnansweredError("The portal did not answer the log-in in time") from e
+    if isinstance(outcome, str):
+        raise LoginFailedError(f"The portal rejected the log-in: {outcome}")
+    return outcome
+
+
+def _login_outcome(driver):
+    """Wait condition: the tracker link once logged in, or the portal's error text."""
+    for tracker_link in driver.find_elements(By.LINK_TEXT, "MY SMART TRACKER"):
+        if tracker_link.is_displayed() and tracker_link.is_enabled():
+            return tracker_link
+    for message in driver.find_elements(By.CSS_SELECTOR, LOGIN_ERROR_SELECTOR):
+        if message.text.strip():
+            return message.text.strip()
+    return False
+
+
+def verify_login(username, password, selenium_url, pool=None, control=None):
+    """Check credentials by logging in, stopping as soon as the tracker link appears.
+
+    Args:
+        username (str): Username for login
+        password (str): Password for login
+        selenium_url (str): URL for Selenium remote webdriver
+        pool (DriverPool, optional): Start the session from this pool and leave it there logged in
+        control (FetchControl, optional): Cancellation and phase deadlines
+
+    Raises:
+        SeleniumUnavailableError: No browser could be started on selenium_url.
+        LoginFailedError: The portal rejected the credentials.
+        LoginUnansweredError: The portal did not answer the submitted log-in in time.
+        PortalChangedError: The log-in page loaded without the form or tracker link.
+    """
+    start_time = time_module.time()
+    control = control or FetchControl()
+    control.start_phase("login")
+    try:
+        driver = pool.acquire() if pool is not None else create_driver(selenium_url)
+    except Exception as e:
+        raise SeleniumUnavailableError(f"Could not start a browser on {selenium_url}: {e}") from e
+    healthy = False
+    try:
+        control.attach(driver)
+        try:
+            _login(driver, username, password, start_time, control)
+        except TimeoutException as e:
+            # A log-in page that loaded without its form means the portal changed
+            if driver.execute_script("return document.readyState") == "complete":
+                raise PortalChangedError("The log-in page does not look as expected") from e
+            raise
+        healthy = True
+        _LOGGER.debug("Log-in verified in %.2f seconds", time_module.time() - start_time)
+    finally:
+        control.detach()
+        _close_driver(driver, pool, reusable=healthy and not control.cancelled)
+
+
+def get_usage_history(username, password, selenium_url, pool=None, control=None):
+    """Get the daily (Week view) and monthly (Month view) totals the tracker offers.
+
+    Args:
+        username (str): Username for login
+        password (str): Password for login
+        selenium_url (str): URL for Selenium remote webdriver
+        pool (DriverPool, optional): Reuse sessions from this pool instead of starting and quitting one
+        control (FetchControl, optional): Cancellation and phase deadlines
+
+    Returns:
+        dict: {"day": {"YYYY-MM-DD": litres}, "month": {"YYYY-MM-01": litres}}
+    """
+    start_time = time_module.time()
+    control = control or FetchControl()
+    history = {"day": {}, "month": {}}
+    healthy = False
+    control.start_phase("login")
+    driver = pool.acquire() if pool is not None else create_driver(selenium_url)
+    try:
+        control.attach(driver)
+        tracker_link = _login(driver, username, password, start_time, control)
+        control.start_phase("navigation")
+        tracker_link.click()
+        control.wait(
+            driver,
+            EC.presence_of_element_located((By.CLASS_NAME, "consumption-history"))
+        )
+        for view, key in (("Week", "day"), ("Month", "month")):
+            control.start_phase("backfill")
+            _switch_view(driver, control, view)
+            periods = {}
+            # The view may open anywhere in its range, so walk back to the start
+            # and then forward to the end. A direction whose button is already
+            # disabled is left out, so a view opening at either end is read once.
+            opened = driver.find_element(By.CLASS_NAME, "consumption-history")
+            directions = [
+                direction
+                for direction in (PREVIOUS_PERIOD, NEXT_PERIOD)
+                if not _is_disabled(
+                    opened.find_element(By.XPATH, f"//button[@aria-label='{direction}']")
+                )
+            ] or [PREVIOUS_PERIOD]
+            for direction in directions:
+                while True:
+                    control.check()
+                    consumption_history = driver.find_element(
+                        By.CLASS_NAME, "consumption-history"
+                    )
+                    period = extract_hourly_data(consumption_history)
+                    periods.update(period)
+                    current = next(iter(period))
+                    if not _step_period(driver, control, consumption_history, direction, current):
+                        break
+            for period_dates, labels in periods.items():
+                history[key].update(parse_period_usage(labels, view, period_dates))
+            _LOGGER.debug("Found %d %s totals", len(history[key]), key)
+        healthy = True
+        return history
+    finally:
+        _LOGGER.debug("History fetch completed in %.2f seconds", time_module.time() - start_time)
+        control.detach()
+        _close_driver(driver, pool, reusable=healthy and not control.cancelled)
+
+
+def get_water_usage(username=None, password=None, selenium_url=None, on_tracker_loaded=None, pool=None, since=None, control=None, probe=None):
     """Get water usage data and return as dictionary.
+
+    Collects iter_water_usage into {"YYYY-MM-DD": {"HH:MM": litres}}; see
+    there for the arguments.
+    """
+    return dict(
+        iter_water_usage(
+            username, password, selenium_url, on_tracker_loaded, pool, since, control, probe
+        )
+    )
+
+
+def _parse_day(day, labels):
+    """Turn a period-dates label and its bar labels into (YYYY-MM-DD, {"HH:MM": litres})."""
+    _LOGGER.debug("Usage for %s: %s", day, labels)
+    time_data = {}
+    for usage in labels:
+        time, value = parse_usage(usage)
+        if time:
+            time_data[time] = value
+    return period_to_iso_date(day), time_data
+
+
+def _extract_day(consumption_history, metrics):
+    """Extract the day on screen, returning its period-dates label and _parse_day's result."""
+    current_date, labels = next(iter(extract_hourly_data(consumption_history).items()))
+    with metrics.phase("parsing"):
+        return current_date, _parse_day(current_date, labels)
+
+
+def iter_water_usage(username=None, password=None, selenium_url=None, on_tracker_loaded=None, pool=None, since=None, control=None, probe=None):
+    """Yield water usage one day at a time, oldest first, as each day is extracted.
+
+    Days already yielded stay valid if a later day fails, so a caller can store
+    them as they arrive.
     
     Args:
         username (str, optional): Username for login
         password (str, optional): Password for login
         selenium_url (str, optional): URL for Selenium remote webdriver
+        on_tracker_loaded (callable, optional): Called with the driver once the tracker chart has loaded
+        pool (DriverPool, optional): Reuse sessions from this pool instead of starting and quitting one
+        since (float, optional): Timestamp up to which data is already stored; days before its local date are not yielded
+        control (FetchControl, optional): Cancellation and phase deadlines, cancel() stops the fetch
+        probe (callable, optional): Called with the landing view's TrackerProbe; returning False ends the fetch early with no data
+
+    Yields:
+        tuple: ("YYYY-MM-DD", {"HH:MM": litres}) for each day.
     """
     if not username or not password or not selenium_url:
         username = os.getenv("WATER_USERNAME")
@@ -78,112 +678,96 @@ def get_water_usage(username=None, password=None, selenium_url=None):
         raise ValueError("No credentials or selenium URL provided")
     start_time = time_module.time()
     _LOGGER.debug("Starting water usage fetch")
+    if control is None:
+        control = FetchControl()
+    since_date = None
+    if since is not None:
+        # Period labels are local dates, so compare in Home Assistant's time zone
+        since_date = dt_util.as_local(dt_util.utc_from_timestamp(since)).date().isoformat()
+
+    metrics = control.metrics
+    capture = CAPTURE_ENABLED
+    driver = None
+    healthy = False
+    attempt = 0
+    # Newest day yielded so far and whether the driver is on the Day view, so a
+    # retry can carry on from where the failed attempt stopped
+    last_day = None
+    day_view = False
+
+    def is_stored(iso_date):
+        return (since_date is not None and iso_date < since_date) or (
+            last_day is not None and iso_date <= last_day
+        )
 
     try:
-        data = {}
-        max_retries = 3
-        retry_count = 0
-
-        while retry_count < max_retries:
+        while True:
             try:
-                _LOGGER.debug("Attempt %d", retry_count + 1)
-                options = webdriver.ChromeOptions()
-                if not DEBUG_MODE:
-                    options.add_argument("--headless")
-                options.add_argument("--no-sandbox")
-                options.add_argument("--disable-gpu")
-                options.add_argument("--start-maximized")
-                options.add_argument("--disable-dev-shm-usage")
-                options.add_experimental_option("excludeSwitches", ["enable-logging"])
-                driver = webdriver.Remote(command_executor=selenium_url, options=options)
-                _LOGGER.debug("Getting log-in page")
-                driver.get(LOGIN_PAGE)
-                _LOGGER.debug("Got log-in page")
-
-                # Wait for cookie popup with better error handling
-                try:
-                    _LOGGER.debug("Waiting for cookie popup")
-                    cookie_popup = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable(
-                            (By.CLASS_NAME, "cookie-request-container")
+                _LOGGER.debug("Attempt %d", attempt + 1)
+                if driver is None:
+                    day_view = False
+                    control.start_phase("login")
+                    with metrics.phase("driver_start"):
+                        if pool is not None:
+                            driver = pool.acquire()
+                            if capture:
+                                # Only look at responses from this navigation
+                                del driver.requests
+                        else:
+                            driver = create_driver(selenium_url, capture)
+                    control.attach(driver)
+
+                if day_view and driver.find_elements(By.CLASS_NAME, "consumption-history"):
+                    _LOGGER.debug("Resuming on the Day view after %s", last_day)
+                else:
+                    day_view = False
+                    control.start_phase("login")
+                    # Includes the cookie_popup phase
+                    with metrics.phase("login"):
+                        tracker_link = _login(driver, username, password, start_time, control)
+
+                    _LOGGER.debug("Successfully logged in, clicking tracker link")
+                    control.start_phase("navigation")
+                    navigation_start = time_module.monotonic()
+                    tracker_link.click()
+
+                    # Switch to Day reporting
+                    control.wait(
+                        driver,
+                        EC.presence_of_element_located(
+                            (By.CLASS_NAME, "consumption-history")
                         )
                     )
-                    _LOGGER.debug("Found cookie popup, clicking")
-                    cookie_popup.click()
-                    _LOGGER.debug(
-                        "Cookie popup handled at %.2f seconds",
-                        time_module.time() - start_time,
-                    )
-                except Exception as e:
-                    _LOGGER.warning("Cookie popup handling failed: %s", str(e))
-                    # Continue anyway as the cookie popup might not appear
-
-                # Wait for login form with explicit element checks
-                _LOGGER.debug("Waiting for login form")
-                username_field = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "username"))
-                )
-                password_field = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "password"))
-                )
-
-                # Clear fields first
-                username_field.clear()
-                password_field.clear()
-
-                # Type credentials with explicit waits
-                _LOGGER.debug("Entering credentials")
-                _LOGGER.debug("username: %s", username)
-                _LOGGER.debug("password: %s", "*" * len(password))
-                time_module.sleep(1)  # Small delay before typing
-                username_field.send_keys(username)
-                time_module.sleep(1)  # Small delay between fields
-                password_field.send_keys(password)
-                time_module.sleep(1)  # Small delay before submit
-
-                # Find and click the login button instead of using RETURN key
-                _LOGGER.debug("Clicking login button")
-                login_button = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
-                )
-                login_button.click()
-
-                # Wait for successful login
-                _LOGGER.debug("Waiting for login to complete")
-                tracker_link = WebDriverWait(driver, 20).until(
-                    EC.element_to_be_clickable((By.LINK_TEXT, "MY SMART TRACKER"))
-                )
-
-                _LOGGER.debug("Successfully logged in, clicking tracker link")
-                tracker_link.click()
-
-                # Switch to Day reporting
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CLASS_NAME, "consumption-history")
-                    )
-                )
-                consumption_history = driver.find_element(
-                    By.CLASS_NAME, "consumption-history"
-                )
-                WebDriverWait(consumption_history, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "button-reset"))
-                )
-                _LOGGER.debug("Change to Day view")
-                period_buttons = consumption_history.find_elements(
-                    By.CLASS_NAME, "button-reset"
-                )
-                for period_button in period_buttons:
-                    if period_button.text == "Day":
-                        period_button.click()
-                        break
-
-                # Dictionary to store all days' data
-                usage_data = {}
-
+                    if on_tracker_loaded is not None:
+                        on_tracker_loaded(driver)
+                    if probe is not None and last_day is None:
+                        with metrics.phase("probe"):
+                            landing = probe_tracker(driver)
+                        if not probe(landing):
+                            _LOGGER.debug("Tracker shows nothing new, skipping extraction")
+                            healthy = True
+                            return
+                    if capture and last_day is None:
+                        # The chart has loaded, so its JSON responses have been captured
+                        data = capture_chart_data(driver)
+                        if data:
+                            _LOGGER.debug("Using captured chart data for %d days", len(data))
+                            yield from sorted(data.items())
+                            healthy = True
+                            return
+                        _LOGGER.debug("No chart data captured, walking the days instead")
+                    _switch_view(driver, control, "Day")
+                    day_view = True
+                    metrics.phases["tracker_navigation"] = time_module.monotonic() - navigation_start
+
+                control.start_phase("extraction")
+                extracted = False
                 while True:  # Loop until there's no more data
+                    control.check()
+                    day_start = time_module.monotonic()
                     # Wait for the consumption history to load
-                    WebDriverWait(driver, 10).until(
+                    control.wait(
+                        driver,
                         EC.presence_of_element_located(
                             (By.CLASS_NAME, "consumption-history")
                         )
@@ -193,77 +777,82 @@ def get_water_usage(username=None, password=None, selenium_url=None):
                         By.CLASS_NAME, "consumption-history"
                     )
 
-                    # Extract current date
-                    current_date = consumption_history.find_element(
-                        By.CLASS_NAME, "period-dates"
-                    ).text
-
-                    # Extract data for the current day
-                    daily_data = extract_hourly_data(consumption_history)
-                    usage_data.update(daily_data)
+                    if EXTRACTION_MODE == "element" and not extracted and (
+                        since_date is not None or last_day is not None
+                    ):
+                        # Element extraction costs a call per bar, so one call for
+                        # the date first decides whether the day needs extracting
+                        current_date = consumption_history.find_element(
+                            By.CLASS_NAME, "period-dates"
+                        ).text
+                        day = None
+                        stored = is_stored(period_to_iso_date(current_date))
+                    else:
+                        # The other modes read the date with the bars in one call,
+                        # so a stored day costs no more to extract than to check
+                        current_date, day = _extract_day(consumption_history, metrics)
+                        stored = is_stored(day[0])
+                    if stored:
+                        _LOGGER.debug("Skipping stored day %s", current_date)
+                    else:
+                        if day is None:
+                            current_date, day = _extract_day(consumption_history, metrics)
+                        extracted = True
+                        last_day = day[0]
+                        yield day
 
                     # Click "Next period range" button to go to the next day
-                    next_button = consumption_history.find_element(
-                        By.XPATH, "//button[@aria-label='Next period range']"
-                    )
-
-                    # Check if the button is disabled
-                    if (
-                        "disabled" in next_button.get_attribute("class")
-                        or not next_button.is_enabled()
-                    ):
+                    stepped = _step_period(driver, control, consumption_history, NEXT_PERIOD, current_date)
+                    metrics.add_day(time_module.monotonic() - day_start)
+                    if not stepped:
                         _LOGGER.debug("No more data available. Exiting loop.")
                         break
-
-                    # Click "Next period range" button
-                    next_button.click()
                     _LOGGER.debug("Next day")
-                    WebDriverWait(driver, 10).until(
-                        lambda d: d.find_element(By.CLASS_NAME, "period-dates").text
-                        != current_date
-                    )
 
-                for day, hours in usage_data.items():
-                    # The date data from ST Water does not have a year. The day data is roughly from the last 8 days so it only matters near the start of a new year.
-                    # If the month is January and the day is December, we need to subtract 1 from the year.
-                    # This is a bit of a hack but it probably works for the current setup.
-                    year = datetime.now().year
-                    month = datetime.now().month
-                    if month == 1 and "December" in day:
-                        year -= 1
-                    _LOGGER.debug("Usage for %s: %s", day, hours)
-                    iso_date = parse_date(day, year)
-                    time_data = {}
-                    for usage in hours:
-                        time, value = parse_usage(usage)
-                        if time:
-                            time_data[time] = value
-                    data[iso_date] = time_data
-
-                return data
+                healthy = True
+                return
 
-            except Exception as e:
+            except FetchCancelledError:
                 raise
 
-            finally:
-                elapsed = time_module.time() - start_time
-                _LOGGER.debug("Execution completed in %.2f seconds", elapsed)
-                if driver is not None:
-                    try:
-                        driver.quit()
-                    except Exception as e:
-                        _LOGGER.warning("Error closing Chrome driver: %s", e)
-                    finally:
-                        driver = None
-
+            except Exception as e:
+                if control.cancelled:
+                    # Quitting the driver on cancel makes the blocked call fail
+                    raise FetchCancelledError(f"Fetch cancelled during {control.phase}") from e
+                kind = classify_error(e)
+                attempt += 1
+                _LOGGER.warning(
+                    "Attempt %d failed after %.2f seconds (%s error): %s",
+                    attempt,
+                    time_module.time() - start_time,
+                    kind,
+                    str(e),
+                )
+                if kind in (ERROR_AUTH, ERROR_LAYOUT, ERROR_UNANSWERED) or attempt >= FETCH_RETRIES:
+                    raise
+                metrics.retries += 1
+                if kind == ERROR_SESSION:
+                    # The session is unusable: the next attempt starts a new one
+                    control.detach()
+                    _close_driver(driver, pool, reusable=False)
+                    driver = None
+                with metrics.phase("retry_backoff"):
+                    control.sleep(retry_delay(attempt))
+
+    finally:
+        elapsed = time_module.time() - start_time
+        _LOGGER.debug("Execution completed in %.2f seconds", elapsed)
+        control.detach()
+        if driver is not None:
+            _close_driver(driver, pool, reusable=healthy and not control.cancelled)
+
+
+def _close_driver(driver, pool, reusable):
+    """Return a driver to its pool, or quit it if there is no pool."""
+    if pool is not None:
+        pool.release(driver, reusable=reusable)
+        return
+    try:
+        driver.quit()
     except Exception as e:
-        retry_count += 1
-        _LOGGER.warning(
-            "Attempt %d failed after %.2f seconds: %s",
-            retry_count,
-            time_module.time() - start_time,
-            str(e),
-        )
-        if retry_count >= max_retries:
-            raise
-        time_module.sleep(5 * retry_count)
+        _LOGGER.warning("Error closing Chrome driver: %s", e)
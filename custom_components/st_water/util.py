@@ -17,6 +17,18 @@ async def async_load_debug_data(hass: HomeAssistant):
     return None
 
 
+async def async_load_debug_recording(hass: HomeAssistant):
+    """Load recorded tracker pages for replay, if a recording exists."""
+    try:
+        recording_file = Path(f"{hass.config.config_dir}/data/recording.json")
+        if recording_file.exists():
+            recording = await hass.async_add_executor_job(_load_json_file, recording_file)
+            return recording["pages"]
+    except Exception as err:
+        _LOGGER.error("Failed to load debug recording: %s", err)
+    return None
+
+
 def _load_json_file(file_path: Path):
     """Load JSON file synchronously (to be run in executor)."""
     with open(file_path, "r", encoding="utf-8") as f:
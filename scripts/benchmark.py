@@ -0,0 +1,149 @@
+"""Offline benchmarks for the ST Water scraper.
+
+Replays tracker pages through a fake WebDriver that counts commands and adds a
+fixed latency per command, so fetch cost can be measured without the portal.
+
+    python scripts/benchmark.py [--recording FILE] [--latency SECONDS] [--faults N,N]
+    python scripts/benchmark.py --record FILE
+
+--record logs in for real using WATER_USERNAME, WATER_PASSWORD and SELENIUM_URL
+and saves every page the fetch sees. Without --recording, synthetic pages are
+used. --faults makes those WebDriver commands fail, to show how retries
+resume. Needs Home Assistant installed, as the integration imports it.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.st_water.coordinator import build_statistics  # noqa: E402
+from custom_components.st_water.replay import (  # noqa: E402
+    RecordingDriver,
+    ReplayDriver,
+    hour_label,
+    load_recording,
+    synthetic_pages,
+)
+from custom_components.st_water.session import DriverPool  # noqa: E402
+from custom_components.st_water.stw_consumption import (  # noqa: E402
+    create_driver,
+    extract_hourly_data,
+    get_water_usage,
+    parse_date,
+    parse_usage,
+)
+from selenium.webdriver.common.by import By  # noqa: E402
+
+def measure(name, func, driver=None):
+    """Run func once and print wall time, WebDriver round trips and allocations."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    round_trips = driver.commands if driver is not None else "-"
+    print(f"{name:<40} {elapsed * 1000:>10.1f} ms {round_trips:>8} cmds {peak / 1024:>10.1f} KiB peak")
+    return result
+
+
+def bench_get_water_usage(pages, latency, faults=()):
+    drivers = []
+
+    def factory():
+        drivers.append(ReplayDriver(pages, latency, faults))
+        return drivers[-1]
+
+    # The fake driver is created inside the call, so report its count afterwards
+    tracemalloc.start()
+    start = time.perf_counter()
+    get_water_usage("user", "pass", "replay", pool=DriverPool(factory, 0))
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{'get_water_usage':<40} {elapsed * 1000:>10.1f} ms "
+        f"{sum(d.commands for d in drivers):>8} cmds {peak / 1024:>10.1f} KiB peak "
+        f"{len(drivers)} sessions"
+    )
+
+
+def bench_extract(pages, latency):
+    day_page = pages[-1]
+    for mode in ("element", "script", "page_source"):
+        driver = ReplayDriver([day_page], latency)
+        driver.get("replay")
+        driver.commands = 0
+        history = driver.find_element(By.CLASS_NAME, "consumption-history")
+        measure(f"extract_hourly_data[{mode}]", partial(extract_hourly_data, history, mode), driver)
+
+
+def bench_parse(count):
+    labels = [hour_label(i % 24, i % 97) for i in range(count)]
+    measure(f"parse_usage x{count}", lambda: [parse_usage(label) for label in labels])
+    days = [f"{d:%A} {d.day} {d:%B}" for d in (date(2024, 1, 1) + timedelta(days=i % 366) for i in range(count))]
+    measure(f"parse_date x{count}", lambda: [parse_date(day, 2024) for day in days])
+
+
+def bench_build_statistics(years):
+    first = date.today() - timedelta(days=365 * years)
+    usage = {
+        (first + timedelta(days=i)).isoformat(): {f"{h:02d}:00": (h * 3 + i) % 50 for h in range(24)}
+        for i in range(365 * years)
+    }
+    measure(f"build_statistics {years}y full", partial(build_statistics, usage, None, 0))
+    last_end = datetime.combine(date.today() - timedelta(days=1), datetime.min.time()).astimezone()
+    measure(f"build_statistics {years}y delta", partial(build_statistics, usage, last_end, 0))
+
+
+def record(path):
+    recorder = None
+
+    def factory():
+        nonlocal recorder
+        recorder = RecordingDriver(create_driver(os.environ["SELENIUM_URL"]))
+        return recorder
+
+    pool = DriverPool(factory, 3600)
+    try:
+        get_water_usage(pool=pool)
+        recorder.save(path)
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recording", help="Replay pages saved with --record")
+    parser.add_argument("--record", help="Record a live fetch to this file")
+    parser.add_argument("--latency", type=float, default=0.03, help="Seconds per WebDriver command")
+    parser.add_argument("--labels", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument(
+        "--faults",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[],
+        help="Comma-separated WebDriver command numbers that fail during the get_water_usage run",
+    )
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record)
+        return
+    pages = load_recording(args.recording) if args.recording else synthetic_pages(
+        [date.today() - timedelta(days=8 - i) for i in range(8)]
+    )
+    bench_get_water_usage(pages, args.latency, args.faults)
+    bench_extract(pages, args.latency)
+    bench_parse(args.labels)
+    bench_build_statistics(args.years)
+
+
+if __name__ == "__main__":
+    main()
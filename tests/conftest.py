@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def day_view_html():
+    """A Day view of the tracker, saved from the portal and trimmed."""
+    return (FIXTURES / "day_view.html").read_text(encoding="utf-8")
@@ -0,0 +1,293 @@
+"""A stateful stand-in for the portal and a remote browser session on it."""
+import threading
+import time as time_module
+from datetime import date, timedelta
+
+from selenium.common.exceptions import InvalidSessionIdException, SessionNotCreatedException
+from selenium.webdriver.common.by import By
+
+from custom_components.st_water.dom import parse_html
+from custom_components.st_water.fetch_control import FetchControl
+from custom_components.st_water.replay import (
+    ACCOUNT_PAGE,
+    COOKIE_BANNER,
+    LOGIN_FORM,
+    ReplayDriver,
+    ReplayElement,
+    _find_all,
+    day_page,
+    synthetic_litres,
+    synthetic_pages,
+    tracker_page,
+)
+from custom_components.st_water.stw_consumption import NEXT_PERIOD, PREVIOUS_PERIOD
+
+USERNAME = "user@example.com"
+PASSWORD = "secret"
+
+LOGIN_ERROR = '<div class="error-message" role="alert">Your email or password is incorrect</div>'
+
+
+class FastControl(FetchControl):
+    """FetchControl whose sleeps take a hundredth of the time asked for."""
+
+    def sleep(self, seconds):
+        super().sleep(seconds / 100)
+
+
+class FakePortal:
+    """The portal's side: the days it has published and what browsers asked of it.
+
+    The tracker opens on the oldest day unless newest_first is set. A correct
+    log-in takes submit_delay seconds to reach the account page. With a
+    capacity, the grid refuses a session while that many are open, idle or not.
+
+    The Week and Month views each offer history_periods periods ending with the
+    one holding end, the newest published day (yesterday by default). They open
+    on the period history_opens_at names: "start", "middle" or "end".
+    """
+
+    def __init__(
+        self,
+        days=8,
+        latency=0.0,
+        submit_delay=0.0,
+        newest_first=False,
+        capacity=None,
+        end=None,
+        history_periods=2,
+        history_opens_at="end",
+    ):
+        end = end or date.today() - timedelta(days=1)
+        self.days = [end - timedelta(days=days - 1 - i) for i in range(days)]
+        self.latency = latency
+        self.submit_delay = submit_delay
+        self.newest_first = newest_first
+        self.capacity = capacity
+        self.end = end
+        self.history_periods = history_periods
+        self.history_opens_at = history_opens_at
+        self.sessions = 0
+        self.logins = 0
+        self.submits = 0
+        self.rejected = 0
+        self.drivers = []
+        self._lock = threading.Lock()
+
+    def driver(self, faults=()):
+        """Start a new browser session, like create_driver."""
+        driver = FakeDriver(self, faults)
+        with self._lock:
+            if self.capacity is not None and self.open_sessions >= self.capacity:
+                raise SessionNotCreatedException("Could not start a new session: the grid is full")
+            self.sessions += 1
+            self.drivers.append(driver)
+        return driver
+
+    @property
+    def open_sessions(self):
+        return sum(not d.closed for d in self.drivers)
+
+    @property
+    def commands(self):
+        return sum(d.commands for d in self.drivers)
+
+    def usage(self, day):
+        """What get_water_usage should return for a published day."""
+        return {f"{hour:02d}:00": synthetic_litres(day, hour) for hour in range(24)}
+
+    def expected(self, days=None):
+        return {d.isoformat(): self.usage(d) for d in (self.days if days is None else days)}
+
+    def replay_pages(self):
+        """The pages a fresh fetch steps through, in order, for a ReplayDriver."""
+        return synthetic_pages(self.days)
+
+    def day_page(self, index):
+        return day_page(self.days[index], index == 0, index == len(self.days) - 1)
+
+    def periods(self, view):
+        """The Week or Month view's periods, oldest first, as lists of their first days."""
+        if view == "Week":
+            start = self.end - timedelta(days=7 * self.history_periods - 1)
+            days = [start + timedelta(days=i) for i in range(7 * self.history_periods)]
+            return [days[i:i + 7] for i in range(0, len(days), 7)]
+        count = 12 * self.history_periods
+        index = self.end.year * 12 + self.end.month - count
+        months = [date((index + i) // 12, (index + i) % 12 + 1, 1) for i in range(count)]
+        return [months[i:i + 12] for i in range(0, count, 12)]
+
+    @staticmethod
+    def history_litres(view, first_day):
+        """Litres a Week view day or Month view month used."""
+        if view == "Week":
+            return first_day.day * 10 + first_day.month
+        return first_day.month * 100 + first_day.year % 100
+
+    def expected_history(self):
+        """What get_usage_history should return."""
+        return {
+            key: {
+                first_day.isoformat(): self.history_litres(view, first_day)
+                for period in self.periods(view)
+                for first_day in period
+            }
+            for view, key in (("Week", "day"), ("Month", "month"))
+        }
+
+    def opening_period(self):
+        """The index the Week and Month views open on."""
+        last = self.history_periods - 1
+        return {"start": 0, "middle": last // 2, "end": last}[self.history_opens_at]
+
+    def period_page(self, view, index):
+        """A Week or Month view, with the year only where the portal shows it."""
+        period = self.periods(view)[index]
+        first, last = period[0], period[-1]
+        if view == "Week":
+            period_dates = f"{first.day} {first:%B} - {last.day} {last:%B} {last.year}"
+            labels = [
+                f"Usage on {d:%A} {d.day} {d:%B} was {self.history_litres(view, d)} Litres"
+                for d in period
+            ]
+        else:
+            period_dates = f"{first:%B %Y} - {last:%B %Y}"
+            labels = [f"Usage in {m:%B} was {self.history_litres(view, m)} Litres" for m in period]
+        return tracker_page(period_dates, labels, index == 0, index == self.history_periods - 1)
+
+
+class FakeDriver(ReplayDriver):
+    """A browser session on a FakePortal, reacting to clicks and typing."""
+
+    def __init__(self, portal, faults=()):
+        super().__init__([], portal.latency, faults)
+        self.portal = portal
+        self.page = "blank"
+        self.logged_in = False
+        self.cookies_accepted = False
+        self.rejected = False
+        self.typed = {}
+        self.day = 0
+        self.view = "Day"
+        self.period = 0
+        self.closed = False
+        self._logged_in_at = None
+
+    @property
+    def current_url(self):
+        if self.closed:
+            raise InvalidSessionIdException("Session was deleted")
+        return self._url
+
+    @current_url.setter
+    def current_url(self, url):
+        self._url = url
+
+    def _command(self):
+        if self.closed:
+            raise InvalidSessionIdException("Session was deleted")
+        super()._command()
+        if self._logged_in_at is not None and time_module.monotonic() >= self._logged_in_at:
+            self._logged_in_at = None
+            self._log_in()
+
+    def _show(self, page):
+        self.page = page
+        self._root = parse_html(self._html())
+
+    def _html(self):
+        if self.page in ("login", "submitting"):
+            cookie = "" if self.cookies_accepted else COOKIE_BANNER
+            error = LOGIN_ERROR if self.rejected and self.page == "login" else ""
+            return f"{cookie}{error}{LOGIN_FORM}"
+        if self.page == "account":
+            return ACCOUNT_PAGE
+        if self.page == "tracker" and self.view != "Day":
+            return self.portal.period_page(self.view, self.period)
+        if self.page == "tracker":
+            return self.portal.day_page(self.day)
+        return ""
+
+    def _log_in(self):
+        self.logged_in = True
+        with self.portal._lock:
+            self.portal.logins += 1
+        self._show("account")
+
+    def get(self, url):
+        self._command()
+        self.current_url = url
+        self._show("account" if self.logged_in else "login")
+
+    @property
+    def page_source(self):
+        self._command()
+        return self._html()
+
+    def find_elements(self, by=By.ID, value=None):
+        self._command()
+        return [FakeElement(self, n) for n in _find_all(self._root, by, value)]
+
+    def _find(self, node, by, value):
+        return FakeElement(self, super()._find(node, by, value)._node)
+
+    def quit(self):
+        self._command()
+        self.closed = True
+
+    def click(self, node):
+        classes = node.classes
+        if "cookie-request-container" in classes:
+            self.cookies_accepted = True
+            self._show(self.page)
+        elif node.tag == "button" and node.attrs.get("type") == "submit":
+            with self.portal._lock:
+                self.portal.submits += 1
+            if self.typed.get("username") and self.typed.get("password") == PASSWORD:
+                self.rejected = False
+                if self.portal.submit_delay:
+                    self._logged_in_at = time_module.monotonic() + self.portal.submit_delay
+                    self._show("submitting")
+                else:
+                    self._log_in()
+            else:
+                self.rejected = True
+                with self.portal._lock:
+                    self.portal.rejected += 1
+                self._show("login")
+        elif node.tag == "a":
+            self.view = "Day"
+            self.day = len(self.portal.days) - 1 if self.portal.newest_first else 0
+            self._show("tracker")
+        elif "button-reset" in classes:
+            self.view = node.text
+            self.day = 0
+            self.period = self.portal.opening_period()
+            self._show("tracker")
+        elif node.get_attribute("aria-label") in (NEXT_PERIOD, PREVIOUS_PERIOD):
+            step = 1 if node.get_attribute("aria-label") == NEXT_PERIOD else -1
+            if self.view == "Day":
+                self.day = min(max(self.day + step, 0), len(self.portal.days) - 1)
+            else:
+                self.period = min(max(self.period + step, 0), self.portal.history_periods - 1)
+            self._show("tracker")
+
+
+class FakeElement(ReplayElement):
+    """An element of the page a FakeDriver is showing."""
+
+    def click(self):
+        self.parent._command()
+        self.parent.click(self._node)
+
+    def clear(self):
+        self.parent._command()
+        self.parent.typed.pop(self._node.get_attribute("id"), None)
+
+    def send_keys(self, *value):
+        self.parent._command()
+        self.parent.typed[self._node.get_attribute("id")] = "".join(value)
+
+    def find_elements(self, by=By.ID, value=None):
+        self.parent._command()
+        return [FakeElement(self.parent, n) for n in _find_all(self._node, by, value)]
@@ -0,0 +1,90 @@
+"""A real Home Assistant core and config entry for coordinator tests.
+
+The recorder is not set up, so tests replace the statistics calls the
+coordinator makes through its module with a Recorder.
+"""
+from contextlib import asynccontextmanager
+from datetime import timedelta
+
+from fakes import PASSWORD, USERNAME
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.st_water import coordinator
+from custom_components.st_water.const import CONF_SELENIUM, CONF_STATISTIC_ID, DOMAIN
+
+
+@asynccontextmanager
+async def running_hass(config_dir):
+    """Start a Home Assistant core keeping its .storage under config_dir."""
+    hass = HomeAssistant(str(config_dir))
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+def config_entry(entry_id="entry", username=USERNAME, selenium_url="http://grid", statistic_id=None):
+    data = {CONF_USERNAME: username, CONF_PASSWORD: PASSWORD, CONF_SELENIUM: selenium_url}
+    if statistic_id is not None:
+        data[CONF_STATISTIC_ID] = statistic_id
+    return ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Severn Trent Water",
+        data=data,
+        source="user",
+        unique_id=username,
+        entry_id=entry_id,
+    )
+
+
+class Recorder:
+    """Stored statistics, and the queries and writes the coordinator makes.
+
+    Writes whose number is in faults raise, like a locked database. Rows can
+    be written ahead with store() to stand in for earlier refreshes.
+    """
+
+    def __init__(self, faults=()):
+        self.faults = set(faults)
+        self.rows = {}
+        self.queries = 0
+        self.writes = []
+
+    def install(self, monkeypatch):
+        monkeypatch.setattr(coordinator, "get_instance", lambda hass: self)
+        monkeypatch.setattr(coordinator, "get_last_statistics", self.get_last_statistics)
+        monkeypatch.setattr(coordinator, "async_add_external_statistics", self.add)
+        return self
+
+    def store(self, statistic_id, rows):
+        self.rows.setdefault(statistic_id, []).extend(rows)
+
+    def get_last_statistics(self, hass, number_of_stats, statistic_id, convert_units, types):
+        self.queries += 1
+        rows = self.rows.get(statistic_id)
+        if not rows:
+            return {}
+        last = rows[-1]
+        start = last["start"].timestamp()
+        # Every row lives in the hourly table, so it ends an hour after it starts
+        end = (last["start"] + timedelta(hours=1)).timestamp()
+        return {statistic_id: [{"start": start, "end": end, "sum": last["sum"]}]}
+
+    def add(self, hass, metadata, statistics):
+        self.writes.append(statistics)
+        if len(self.writes) in self.faults:
+            raise RuntimeError("database is locked")
+        self.store(metadata["statistic_id"], statistics)
+
+    def written(self, statistic_id):
+        return self.rows.get(statistic_id, [])
+
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+    async def async_block_till_done(self):
+        pass
@@ -0,0 +1,84 @@
+"""Run the scripts the scraper sends to the browser in Node.js.
+
+Node has no DOM, so the element passed to the script is a small stand-in
+built from a parsed page. It supports what the scraper's scripts use:
+querySelector(All) with tag and .class selectors, getAttribute and innerText.
+"""
+import json
+import shutil
+import subprocess
+
+import pytest
+
+NODE = shutil.which("node")
+
+needs_node = pytest.mark.skipif(NODE is None, reason="Node.js is not installed")
+
+RUNNER = r"""
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+
+function* descendants(node) {
+    for (const child of node.children) {
+        yield child;
+        yield* descendants(child);
+    }
+}
+
+function matches(node, selector) {
+    const [tag, ...classes] = selector.split('.');
+    if (tag && node.tag !== tag) return false;
+    const own = (node.attrs['class'] || '').split(/\s+/);
+    return classes.every(c => own.includes(c));
+}
+
+class Element {
+    constructor(node) { this.node = node; }
+    get innerText() { return this.node.text; }
+    getAttribute(name) {
+        return name in this.node.attrs ? this.node.attrs[name] : null;
+    }
+    querySelectorAll(selector) {
+        const found = [];
+        for (const node of descendants(this.node)) {
+            if (selector.split(',').some(s => matches(node, s.trim()))) found.push(new Element(node));
+        }
+        return found;
+    }
+    querySelector(selector) {
+        return this.querySelectorAll(selector)[0] || null;
+    }
+}
+
+const result = new Function(input.script).apply(null, [new Element(input.root)]);
+process.stdout.write(JSON.stringify(result === undefined ? null : result));
+"""
+
+
+def _serialise(node):
+    return {
+        "tag": node.tag,
+        "attrs": node.attrs,
+        "text": node.text,
+        "children": [_serialise(child) for child in node.children],
+    }
+
+
+def run_script(script, node):
+    """Run script in Node.js with a stand-in for node as arguments[0].
+
+    Args:
+        script (str): The script body, as passed to execute_script.
+        node (Node): The parsed element the script is given.
+
+    Returns:
+        The script's return value, decoded from JSON.
+    """
+    result = subprocess.run(
+        [NODE, "-e", RUNNER],
+        input=json.dumps({"script": script, "root": _serialise(node)}),
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=30,
+    )
+    return json.loads(result.stdout)
@@ -0,0 +1,69 @@
+"""Local aiohttp servers standing in for the portal."""
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from aiohttp import web
+
+
+@asynccontextmanager
+async def stub_server(routes):
+    """
+    Serve an aiohttp app on a free localhost port.
+
+    Args:
+        routes (list): aiohttp RouteDefs, e.g. [web.get("/path", handler)].
+
+    Yields:
+        str: The base URL, without a trailing slash.
+    """
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        await runner.cleanup()
+
+
+@contextmanager
+def threaded_stub_server(routes, host="127.0.0.1"):
+    """
+    Serve an aiohttp app from a background thread, for code that blocks.
+
+    Args:
+        routes (list): aiohttp RouteDefs.
+        host (str, optional): Address to listen on.
+
+    Yields:
+        int: The port it listens on.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def start():
+        app = web.Application()
+        app.add_routes(routes)
+        state["runner"] = runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, host, 0)
+        await site.start()
+        state["port"] = site._server.sockets[0].getsockname()[1]
+        started.set()
+
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(start(), loop).result(timeout=10)
+    started.wait()
+    try:
+        yield state["port"]
+    finally:
+        asyncio.run_coroutine_threadsafe(state["runner"].cleanup(), loop).result(timeout=10)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        loop.close()
@@ -0,0 +1,72 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+import homeassistant.util.dt as dt_util
+import pytest
+from home import Recorder, config_entry, running_hass
+
+from custom_components.st_water.coordinator import STWaterMeterUpdateCoordinator
+
+TODAY = date(2024, 5, 15)
+STATISTIC_ID = "st_water:consumption_daily"
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/London"))
+    yield Recorder().install(monkeypatch)
+    dt_util.set_default_time_zone(timezone.utc)
+
+
+def _import(tmp_path, totals, current, statistic_id=STATISTIC_ID):
+    async def run():
+        async with running_hass(tmp_path) as hass:
+            coordinator = STWaterMeterUpdateCoordinator(hass, config_entry())
+            await coordinator._async_import_totals(statistic_id, "Daily", totals, current)
+
+    asyncio.run(run())
+
+
+def _local_start(day):
+    return dt_util.as_local(
+        datetime(day.year, day.month, day.day, tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    )
+
+
+def test_current_day_is_left_for_a_later_run(tmp_path, recorder):
+    totals = {(TODAY - timedelta(days=i)).isoformat(): 100 + i for i in range(3)}
+
+    _import(tmp_path, totals, TODAY)
+
+    written = recorder.written(STATISTIC_ID)
+    assert [dt_util.as_local(r["start"]).date() for r in written] == [
+        TODAY - timedelta(days=2),
+        TODAY - timedelta(days=1),
+    ]
+    assert written[-1]["sum"] == 102 + 101
+
+
+def test_day_left_out_is_written_complete_next_time(tmp_path, recorder):
+    yesterday = TODAY - timedelta(days=1)
+    recorder.store(STATISTIC_ID, [{"start": dt_util.as_utc(_local_start(yesterday)), "sum": 203.0}])
+
+    # The next day, with today's total complete
+    _import(
+        tmp_path,
+        {yesterday.isoformat(): 101, TODAY.isoformat(): 180, (TODAY + timedelta(days=1)).isoformat(): 20},
+        TODAY + timedelta(days=1),
+    )
+
+    written = recorder.writes[0]
+    assert [(dt_util.as_local(r["start"]).date(), r["state"], r["sum"]) for r in written] == [
+        (TODAY, 180.0, 383.0)
+    ]
+
+
+def test_current_month_is_left_out(tmp_path, recorder):
+    totals = {"2024-03-01": 3000, "2024-04-01": 3100, "2024-05-01": 1400}
+
+    _import(tmp_path, totals, TODAY.replace(day=1), "st_water:consumption_monthly")
+
+    written = recorder.written("st_water:consumption_monthly")
+    assert [dt_util.as_local(r["start"]).date().isoformat() for r in written] == ["2024-03-01", "2024-04-01"]
@@ -0,0 +1,110 @@
+"""Browser profile tests.
+
+The stub-site comparison needs a Selenium grid that can reach this machine:
+
+    SELENIUM_URL=http://selenium:4444 STUB_SITE_HOST=<this machine's address> python -m pytest -s tests/test_browser_options.py
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+
+import pytest
+from aiohttp import web
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from stubs import threaded_stub_server
+
+from custom_components.st_water import stw_consumption
+from custom_components.st_water.const import BLOCKED_HOSTS, BROWSER_WINDOW_SIZE
+from custom_components.st_water.stw_consumption import create_driver
+
+SELENIUM_URL = os.getenv("SELENIUM_URL")
+STUB_SITE_HOST = os.getenv("STUB_SITE_HOST")
+
+
+@pytest.fixture
+def no_grid(monkeypatch):
+    """Make create_driver return the options it would start a session with."""
+
+    def remote(command_executor, options):
+        return options
+
+    monkeypatch.setattr(stw_consumption.webdriver, "Remote", remote)
+
+
+def test_lean_browser_is_off_by_default(no_grid):
+    options = create_driver("http://grid")
+
+    assert "--start-maximized" in options.arguments
+    assert options.page_load_strategy == "normal"
+    assert not any(a.startswith("--host-resolver-rules") for a in options.arguments)
+
+
+def test_lean_options(monkeypatch, no_grid):
+    monkeypatch.setattr(stw_consumption, "LEAN_BROWSER", True)
+
+    options = create_driver("http://grid")
+
+    assert options.page_load_strategy == "eager"
+    assert "--start-maximized" not in options.arguments
+    assert f"--window-size={BROWSER_WINDOW_SIZE}" in options.arguments
+    assert "--blink-settings=imagesEnabled=false" in options.arguments
+    assert options.experimental_options["prefs"] == {"profile.managed_default_content_settings.images": 2}
+    rules = next(a for a in options.arguments if a.startswith("--host-resolver-rules="))
+    for host in BLOCKED_HOSTS:
+        assert f"MAP {host} ~NOTFOUND" in rules
+        assert f"MAP *.{host} ~NOTFOUND" in rules
+
+
+STUB_PAGE = """<!DOCTYPE html>
+<html><head>
+<style>@font-face { font-family: Brand; src: url(/font.woff2); } body { font-family: Brand; }</style>
+<script async src="https://www.google-analytics.com/analytics.js"></script>
+</head><body>
+<img src="/banner.png"><img src="/slow.png">
+<div class="consumption-history"><p class="period-dates">Tuesday 14 May</p></div>
+</body></html>
+"""
+
+
+@pytest.mark.skipif(
+    not (SELENIUM_URL and STUB_SITE_HOST), reason="needs SELENIUM_URL and STUB_SITE_HOST"
+)
+def test_lean_profile_against_a_stub_site(monkeypatch):
+    hits = Counter()
+
+    async def page(request):
+        return web.Response(text=STUB_PAGE, content_type="text/html")
+
+    async def asset(request):
+        hits[request.path] += 1
+        if request.path == "/slow.png":
+            # A slow asset holds up the load event, but not DOMContentLoaded
+            await asyncio.sleep(3)
+        return web.Response(body=b"", content_type="application/octet-stream")
+
+    timings = {}
+    routes = [web.get("/", page), web.get("/{name}", asset)]
+    with threaded_stub_server(routes, host="0.0.0.0") as port:
+        for lean in (False, True):
+            monkeypatch.setattr(stw_consumption, "LEAN_BROWSER", lean)
+            hits.clear()
+            driver = create_driver(SELENIUM_URL)
+            try:
+                started_at = time.monotonic()
+                driver.get(f"http://{STUB_SITE_HOST}:{port}/")
+                WebDriverWait(driver, 30).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "consumption-history"))
+                )
+                timings[lean] = time.monotonic() - started_at
+            finally:
+                driver.quit()
+            if lean:
+                assert hits["/banner.png"] == hits["/slow.png"] == hits["/font.woff2"] == 0
+            else:
+                assert hits["/banner.png"] == 1
+    print(f"\nPage ready: full profile {timings[False]:.2f}s, lean profile {timings[True]:.2f}s")
+    assert timings[True] < timings[False]
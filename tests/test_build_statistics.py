@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime, timezone
+
+import homeassistant.util.dt as dt_util
+import pytest
+
+from custom_components.st_water.coordinator import build_statistics
+
+
+@pytest.fixture(autouse=True)
+def time_zone():
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/London"))
+    yield
+    dt_util.set_default_time_zone(timezone.utc)
+
+
+def _day(litres=1):
+    return {f"{hour:02d}:00": litres for hour in range(24)}
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_nothing_stored_writes_every_hour():
+    rows, total = build_statistics({"2024-01-02": _day(2), "2024-01-01": _day(1)}, None, 0)
+
+    assert len(rows) == 48
+    assert rows[0]["start"] == _utc(2024, 1, 1, 0)
+    assert [row["sum"] for row in rows[:2]] == [1, 2]
+    assert rows[24]["sum"] == 26
+    assert total == 72
+
+
+def test_mid_day_last_end_writes_only_later_hours():
+    # 14:00 local in British Summer Time is 13:00 UTC
+    last_end = _utc(2024, 6, 1, 13)
+
+    rows, total = build_statistics({"2024-06-01": _day(3)}, last_end, 100)
+
+    assert [row["start"] for row in rows] == [_utc(2024, 6, 1, h) for h in range(13, 23)]
+    assert [row["state"] for row in rows] == [3.0] * 10
+    # The stored sum carries on from the last stored hour
+    assert [row["sum"] for row in rows] == [100 + 3 * n for n in range(1, 11)]
+    assert total == 130
+
+
+def test_days_ended_by_last_end_are_skipped(caplog):
+    caplog.set_level(logging.DEBUG)
+    last_end = _utc(2024, 1, 3, 0)
+    usage = {"2024-01-01": _day(5), "2024-01-02": _day(5), "2024-01-03": _day(1)}
+
+    rows, total = build_statistics(usage, last_end, 50)
+
+    # Whole days before last_end are skipped without looking at their hours
+    assert "Skipping date: 2024-01-01" in caplog.text
+    assert "Skipping date: 2024-01-02" in caplog.text
+    assert {row["start"].date() for row in rows} == {datetime(2024, 1, 3).date()}
+    assert rows[0]["start"] == last_end
+    assert rows[0]["sum"] == 51
+    assert total == 74
+
+
+def test_everything_already_stored_leaves_the_sum_alone():
+    rows, total = build_statistics({"2024-01-01": _day()}, _utc(2024, 1, 2, 0), 24)
+
+    assert rows == []
+    assert total == 24
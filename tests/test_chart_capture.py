@@ -0,0 +1,117 @@
+import asyncio
+import gzip
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from stubs import stub_server
+
+from custom_components.st_water import chart_capture
+from custom_components.st_water.chart_capture import (
+    capture_chart_data,
+    hourly_only,
+    is_json_response,
+    parse_chart_payload,
+    release_proxy_port,
+    reserve_proxy_port,
+)
+from custom_components.st_water.const import CAPTURE_PROXY_PORT, CAPTURE_PROXY_PORTS
+from custom_components.st_water.retry import SeleniumUnavailableError
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+@pytest.fixture
+def payloads():
+    return json.loads((FIXTURES / "chart_payloads.json").read_text(encoding="utf-8"))
+
+
+def test_parse_chart_payload_reads_hourly_records(payloads):
+    data = parse_chart_payload(payloads["hourly"])
+
+    assert sorted(data) == ["2024-05-13", "2024-05-14"]
+    assert len(data["2024-05-14"]) == 24
+    assert data["2024-05-14"]["07:00"] == (7 * 3 + 14) % 20
+
+
+def test_hourly_only_drops_daily_series(payloads):
+    data = parse_chart_payload(payloads["daily"])
+    parse_chart_payload(payloads["hourly"], data)
+
+    hourly = hourly_only(data)
+
+    assert sorted(hourly) == ["2024-05-13", "2024-05-14"]
+    assert "2024-05-10" in data and "2024-05-10" not in hourly
+
+
+async def _capture_from_stub(payloads):
+    """Fetch every stub endpoint and wrap the responses like selenium-wire does."""
+    body = json.dumps(payloads["hourly"]).encode("utf-8")
+
+    async def hourly(request):
+        return web.Response(
+            body=gzip.compress(body),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+
+    async def daily(request):
+        return web.json_response(payloads["daily"])
+
+    async def page(request):
+        return web.Response(text="<html></html>", content_type="text/html")
+
+    async def missing(request):
+        return web.json_response({"error": "not found"}, status=404)
+
+    routes = [
+        web.get("/api/hourly", hourly),
+        web.get("/api/daily", daily),
+        web.get("/tracker", page),
+        web.get("/api/missing", missing),
+    ]
+    requests = []
+    async with stub_server(routes) as base, aiohttp.ClientSession(auto_decompress=False) as session:
+        for path in ("/tracker", "/api/daily", "/api/hourly", "/api/missing"):
+            async with session.get(base + path) as response:
+                requests.append(
+                    SimpleNamespace(
+                        url=base + path,
+                        response=SimpleNamespace(
+                            status_code=response.status,
+                            headers=dict(response.headers),
+                            body=await response.read(),
+                        ),
+                    )
+                )
+    return requests
+
+
+def test_only_successful_json_responses_are_read(payloads):
+    requests = asyncio.run(_capture_from_stub(payloads))
+
+    assert [is_json_response(r) for r in requests] == [False, True, True, False]
+
+
+def test_capture_chart_data_from_stub_responses(payloads):
+    pytest.importorskip("seleniumwire")
+    requests = asyncio.run(_capture_from_stub(payloads))
+
+    data = capture_chart_data(SimpleNamespace(requests=requests))
+
+    assert data == hourly_only(parse_chart_payload(payloads["hourly"]))
+
+
+def test_each_capture_driver_gets_its_own_proxy_port(monkeypatch):
+    monkeypatch.setattr(chart_capture, "_ports_in_use", set())
+
+    ports = [reserve_proxy_port() for _ in range(CAPTURE_PROXY_PORTS)]
+
+    assert ports == list(range(CAPTURE_PROXY_PORT, CAPTURE_PROXY_PORT + CAPTURE_PROXY_PORTS))
+    with pytest.raises(SeleniumUnavailableError):
+        reserve_proxy_port()
+    release_proxy_port(ports[1])
+    assert reserve_proxy_port() == ports[1]
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta, timezone
+
+import homeassistant.util.dt as dt_util
+import pytest
+
+from custom_components.st_water.const import DERIVED_DAYS
+from custom_components.st_water.derived import DerivedUsage
+
+
+@pytest.fixture(autouse=True)
+def time_zone():
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Europe/London"))
+    yield
+    dt_util.set_default_time_zone(timezone.utc)
+
+
+def _rows(first, litres):
+    """Hourly rows starting at first (UTC), one per value in litres."""
+    return [{"start": first + timedelta(hours=i), "state": float(v)} for i, v in enumerate(litres)]
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_nonzero_run_restarts_after_a_gap_or_a_zero_hour():
+    derived = DerivedUsage()
+
+    derived.add_rows(_rows(_utc(2024, 1, 1, 10), [1, 2, 3, 4]))
+    assert derived.nonzero_hours == 4
+
+    # 15:00 is missing, so the run starts again at 16:00
+    derived.add_rows(_rows(_utc(2024, 1, 1, 16), [5, 6]))
+    assert derived.nonzero_hours == 2
+
+    derived.add_rows(_rows(_utc(2024, 1, 1, 18), [7, 0]))
+    assert derived.nonzero_hours == 0
+
+    derived.add_rows(_rows(_utc(2024, 1, 1, 20), [8]))
+    assert derived.nonzero_hours == 1
+
+
+def test_overnight_minimum_follows_local_midnight():
+    # In British Summer Time local midnight is 23:00 UTC
+    derived = DerivedUsage()
+
+    derived.add_rows(_rows(_utc(2024, 6, 1, 22), [0, 6, 4, 5, 3, 7, 0]))
+
+    # 23:00 local belongs to the day before and 05:00 local is morning, so
+    # neither of their zero hours counts
+    assert derived.overnight == {date(2024, 6, 2): 3.0}
+    assert derived.overnight_minimum == 3.0
+    assert derived.daily == {date(2024, 6, 1): 0.0, date(2024, 6, 2): 25.0}
+
+
+def test_only_the_last_derived_days_are_kept():
+    derived = DerivedUsage()
+    first = date(2024, 1, 1)
+    days = [first + timedelta(days=i) for i in range(DERIVED_DAYS + 3)]
+
+    for day in days:
+        # 01:00 and 12:00 each day, so every day has an overnight minimum too
+        derived.add_rows(
+            [
+                {"start": _utc(day.year, day.month, day.day, 1), "state": 1.0},
+                {"start": _utc(day.year, day.month, day.day, 12), "state": 2.0},
+            ]
+        )
+
+    assert sorted(derived.daily) == days[-DERIVED_DAYS:]
+    assert sorted(derived.overnight) == days[-DERIVED_DAYS:]
+    assert derived.week_total == 7 * 3.0
+
+
+def test_rows_already_folded_in_are_skipped():
+    derived = DerivedUsage()
+    rows = _rows(_utc(2024, 1, 1, 0), [1] * 24)
+    derived.add_rows(rows)
+
+    derived.add_rows(rows)
+    # A restart carries last_start over, so an overlapping batch only adds its new row
+    restored = DerivedUsage(derived.as_dict())
+    restored.add_rows(rows[-2:] + _rows(_utc(2024, 1, 2, 0), [5]))
+
+    assert derived.daily == {date(2024, 1, 1): 24.0}
+    assert derived.nonzero_hours == 24
+    assert restored.daily == {date(2024, 1, 1): 24.0, date(2024, 1, 2): 5.0}
+    assert restored.nonzero_hours == 25
+    assert restored.last_start == _utc(2024, 1, 2, 0).timestamp()
@@ -0,0 +1,56 @@
+import asyncio
+from collections import deque
+from types import SimpleNamespace
+
+from homeassistant.components.diagnostics import REDACTED
+
+from custom_components.st_water.const import CONF_SELENIUM, CONF_STATISTIC_ID, DOMAIN
+from custom_components.st_water.diagnostics import async_get_config_entry_diagnostics
+from custom_components.st_water.publish_model import PublishModel
+
+EMAIL = "someone@example.com"
+
+
+class _Entry:
+    entry_id = "abc"
+    title = "Severn Trent Water 2"
+
+    def __init__(self):
+        self.data = {
+            "username": EMAIL,
+            "password": "secret",
+            CONF_SELENIUM: "http://selenium:4444",
+            CONF_STATISTIC_ID: "st_water:consumption_2",
+        }
+
+    def as_dict(self):
+        return {"entry_id": self.entry_id, "title": self.title, "unique_id": EMAIL, "data": dict(self.data)}
+
+
+def _diagnostics(entry):
+    coordinator = SimpleNamespace(
+        statistic_id=entry.data[CONF_STATISTIC_ID],
+        last_update_success=True,
+        driver_pool=SimpleNamespace(idle_count=0, sessions_created=1),
+        fetch_history=deque(),
+        publish_model=PublishModel(),
+        update_interval=None,
+    )
+    hass = SimpleNamespace(data={DOMAIN: {entry.entry_id: coordinator}})
+    return asyncio.run(async_get_config_entry_diagnostics(hass, entry))
+
+
+def test_credentials_and_unique_id_are_redacted():
+    diagnostics = _diagnostics(_Entry())
+
+    assert "someone" not in repr(diagnostics)
+    assert "secret" not in repr(diagnostics)
+    assert diagnostics["entry"]["unique_id"] == REDACTED
+    assert diagnostics["entry"]["data"][CONF_SELENIUM] == "http://selenium:4444"
+
+
+def test_numbered_statistic_id_and_title_are_kept():
+    diagnostics = _diagnostics(_Entry())
+
+    assert diagnostics["statistic_id"] == "st_water:consumption_2"
+    assert diagnostics["entry"]["title"] == "Severn Trent Water 2"
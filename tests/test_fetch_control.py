@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+
+from custom_components.st_water.fetch_control import FetchCancelledError, FetchControl
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_water_usage
+
+
+def _start(portal, pool, control):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["data"] = get_water_usage(USERNAME, PASSWORD, "http://grid", pool=pool, control=control)
+        except Exception as err:
+            outcome["error"] = err
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_cancel_stops_a_slow_fetch_promptly():
+    # 50 ms a command: a full fetch would take well over ten seconds
+    portal = FakePortal(latency=0.05)
+    pool = DriverPool(portal.driver, idle_ttl=600)
+    control = FastControl()
+    thread, outcome = _start(portal, pool, control)
+    time.sleep(0.5)
+
+    cancelled_at = time.monotonic()
+    control.cancel()
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert time.monotonic() - cancelled_at < 1
+    assert isinstance(outcome.get("error"), FetchCancelledError)
+    # The cancelled session is quit, not handed back for reuse
+    assert portal.drivers[0].closed
+    assert pool.idle_count == 0
+
+
+def test_cancel_wakes_a_sleeping_fetch():
+    control = FetchControl()
+    threading.Timer(0.1, control.cancel).start()
+
+    started = time.monotonic()
+    with pytest.raises(FetchCancelledError):
+        control.sleep(30)
+
+    assert time.monotonic() - started < 1
+
+
+def test_cancel_before_the_fetch_starts_no_session():
+    portal = FakePortal()
+    control = FastControl()
+    control.cancel()
+
+    with pytest.raises(FetchCancelledError):
+        get_water_usage(USERNAME, PASSWORD, "http://grid", pool=DriverPool(portal.driver, 600), control=control)
+
+    assert portal.sessions == 0
+
+
+def test_cancel_during_start_up_quits_the_new_driver():
+    portal = FakePortal()
+    control = FastControl()
+
+    def start_and_cancel():
+        # The fetch is cancelled while the grid is still starting the session
+        driver = portal.driver()
+        control.cancel()
+        return driver
+
+    with pytest.raises(FetchCancelledError):
+        get_water_usage(USERNAME, PASSWORD, "http://grid", pool=DriverPool(start_and_cancel, 600), control=control)
+
+    assert portal.drivers[0].closed
+    assert portal.logins == 0
@@ -0,0 +1,113 @@
+from collections import Counter
+from datetime import date
+
+import pytest
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+
+from custom_components.st_water import stw_consumption
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_usage_history, parse_period_usage
+
+MONTHS = ["February", "March", "April", "May", "June", "July", "August",
+          "September", "October", "November", "December", "January"]
+
+
+def test_month_period_crossing_a_year():
+    labels = [f"Usage in {month} was {i} Litres" for i, month in enumerate(MONTHS)]
+
+    usage = parse_period_usage(labels, "Month", "February 2025 - January 2026")
+
+    assert list(usage) == [f"2025-{m:02d}-01" for m in range(2, 13)] + ["2026-01-01"]
+    assert usage["2025-02-01"] == 0
+    assert usage["2026-01-01"] == 11
+
+
+def test_week_period_crossing_a_year():
+    labels = [
+        "Usage on Monday 29 December was 10 Litres",
+        "Usage on Wednesday 31 December was 12 Litres",
+        "Usage on Thursday 1 January was 13 Litres",
+        "Usage on Sunday 4 January was 16 Litres",
+    ]
+
+    usage = parse_period_usage(labels, "Week", "29 December - 4 January 2026")
+
+    assert usage == {"2025-12-29": 10, "2025-12-31": 12, "2026-01-01": 13, "2026-01-04": 16}
+
+
+def test_year_in_a_label_wins_over_the_period_dates():
+    labels = ["Usage in December 2024 was 5 Litres", "Usage in January was 6 Litres"]
+
+    usage = parse_period_usage(labels, "Month", "February 2025 - January 2026")
+
+    assert usage == {"2024-12-01": 5, "2026-01-01": 6}
+
+
+def test_without_a_year_the_newest_bar_is_its_most_recent_occurrence():
+    labels = ["Usage in November was 1 Litres", "Usage in December was 2 Litres", "Usage in January was 3 Litres"]
+
+    assert parse_period_usage(labels, "Month", today=date(2026, 1, 10)) == {
+        "2025-11-01": 1,
+        "2025-12-01": 2,
+        "2026-01-01": 3,
+    }
+    # A date still to come this year was last year's
+    assert parse_period_usage(labels[:2], "Month", today=date(2026, 1, 10)) == {
+        "2025-11-01": 1,
+        "2025-12-01": 2,
+    }
+
+
+def test_29_february_outside_a_leap_year_is_ignored():
+    labels = ["Usage on Friday 28 February was 1 Litres", "Usage on Saturday 29 February was 2 Litres"]
+
+    assert parse_period_usage(labels, "Week", "24 February - 2 March 2025") == {"2025-02-28": 1}
+
+
+def _history(portal, monkeypatch):
+    reads = Counter()
+    extract = stw_consumption.extract_hourly_data
+
+    def counting_extract(consumption_history, mode=None):
+        period = extract(consumption_history, mode)
+        reads.update(list(period))
+        return period
+
+    monkeypatch.setattr(stw_consumption, "extract_hourly_data", counting_extract)
+    history = get_usage_history(
+        USERNAME, PASSWORD, "http://grid", pool=DriverPool(portal.driver, idle_ttl=0), control=FastControl()
+    )
+    return history, reads
+
+
+@pytest.mark.parametrize("opens_at", ["start", "end"])
+def test_view_opening_at_either_end_reads_each_period_once(monkeypatch, opens_at):
+    # The newest week and the newest twelve months both start in the year before
+    portal = FakePortal(end=date(2026, 1, 3), history_periods=3, history_opens_at=opens_at)
+
+    history, reads = _history(portal, monkeypatch)
+
+    assert history == portal.expected_history()
+    assert "2025-12-28" in history["day"] and "2026-01-03" in history["day"]
+    assert "2024-02-01" in history["month"] and "2026-01-01" in history["month"]
+    assert len(reads) == 6
+    assert set(reads.values()) == {1}
+
+
+def test_view_opening_in_the_middle_walks_both_ways(monkeypatch):
+    portal = FakePortal(end=date(2026, 1, 3), history_periods=3, history_opens_at="middle")
+
+    history, reads = _history(portal, monkeypatch)
+
+    assert history == portal.expected_history()
+    # Walking back to the start and then forward passes the first two periods twice
+    assert sorted(reads.values()) == [1, 1, 2, 2, 2, 2]
+
+
+def test_single_period_is_read_once(monkeypatch):
+    portal = FakePortal(end=date(2026, 1, 3), history_periods=1)
+
+    history, reads = _history(portal, monkeypatch)
+
+    assert history == portal.expected_history()
+    assert sorted(reads.values()) == [1, 1]
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from stubs import stub_server
+
+from custom_components.st_water.chart_capture import hourly_only, parse_chart_payload
+from custom_components.st_water.http_client import PortalSession, SessionExpiredError
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+COOKIES = [
+    {"name": "session", "value": "abc123", "domain": "127.0.0.1"},
+    {"name": "other", "value": "x", "domain": ".example.com"},
+]
+
+
+@pytest.fixture
+def payloads():
+    return json.loads((FIXTURES / "chart_payloads.json").read_text(encoding="utf-8"))
+
+
+def _portal_routes(payloads, seen):
+    def authorised(request):
+        seen.append((request.path, request.headers.get("Cookie")))
+        return request.cookies.get("session") == "abc123"
+
+    async def hourly(request):
+        if not authorised(request):
+            return web.json_response({}, status=401)
+        return web.json_response(payloads["hourly"])
+
+    async def daily(request):
+        if not authorised(request):
+            return web.json_response({}, status=401)
+        return web.json_response(payloads["daily"])
+
+    async def profile(request):
+        authorised(request)
+        return web.json_response({"name": "no readings here"})
+
+    async def broken(request):
+        return web.json_response({}, status=500)
+
+    async def login_redirect(request):
+        raise web.HTTPFound("/log-in/")
+
+    async def login_page(request):
+        return web.Response(text="<form id='password'></form>", content_type="text/html")
+
+    async def forbidden(request):
+        return web.json_response({}, status=401)
+
+    return [
+        web.get("/api/hourly", hourly),
+        web.get("/api/daily", daily),
+        web.get("/api/profile", profile),
+        web.get("/api/broken", broken),
+        web.get("/api/redirect", login_redirect),
+        web.get("/api/html", login_page),
+        web.get("/api/forbidden", forbidden),
+    ]
+
+
+async def _fetch(payloads, paths, seen=None):
+    seen = [] if seen is None else seen
+    async with stub_server(_portal_routes(payloads, seen)) as base, aiohttp.ClientSession() as session:
+        portal = PortalSession(COOKIES, [base + p for p in paths], user_agent="test-agent")
+        data = await portal.async_get_water_usage(session)
+        return data, [url[len(base):] for url in portal.endpoints]
+
+
+def test_reads_hourly_data_with_exported_cookies(payloads):
+    seen = []
+    data, endpoints = asyncio.run(
+        _fetch(payloads, ["/api/profile", "/api/daily", "/api/broken", "/api/hourly"], seen)
+    )
+
+    assert data == hourly_only(parse_chart_payload(payloads["hourly"]))
+    # Only the cookie for the endpoint's host is sent
+    assert all(cookie == "session=abc123" for _, cookie in seen)
+    # Endpoints without readings are dropped for the next refresh
+    assert endpoints == ["/api/daily", "/api/hourly"]
+
+
+@pytest.mark.parametrize("path", ["/api/redirect", "/api/forbidden", "/api/html"])
+def test_expired_session_is_reported(payloads, path):
+    with pytest.raises(SessionExpiredError):
+        asyncio.run(_fetch(payloads, ["/api/hourly", path]))
+
+
+def test_no_hourly_endpoint_returns_nothing(payloads):
+    data, endpoints = asyncio.run(_fetch(payloads, ["/api/profile", "/api/broken"]))
+
+    assert data == {}
+    assert endpoints == ["/api/profile", "/api/broken"]
+
+
+class _TrackerDriver:
+    def execute_script(self, script):
+        if "userAgent" in script:
+            return "test-agent"
+        return [
+            "https://www.stwater.co.uk/api/usage?period=day",
+            "https://www.google-analytics.com/collect",
+        ]
+
+    def get_cookies(self):
+        return COOKIES
+
+
+def test_from_driver_keeps_portal_endpoints_only():
+    portal = PortalSession.from_driver(_TrackerDriver())
+
+    assert portal.endpoints == ["https://www.stwater.co.uk/api/usage?period=day"]
+    assert portal.user_agent == "test-agent"
+    assert portal.cookie_header("https://www.example.com/") == "other=x"
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+import pytest
+from fakes import FakePortal, FastControl
+from home import Recorder, config_entry, running_hass
+
+from custom_components.st_water import coordinator as coordinator_module
+from custom_components.st_water.const import DOMAIN, STORE_LAST_STATISTIC
+from custom_components.st_water.coordinator import STWaterMeterUpdateCoordinator
+from custom_components.st_water.scheduler import DATA_SCHEDULER, FetchScheduler
+from custom_components.st_water.session import DriverPool
+
+STATISTIC_ID = "st_water:consumption"
+
+
+@pytest.fixture(autouse=True)
+def fast_fetch(monkeypatch):
+    monkeypatch.setattr(coordinator_module, "FetchControl", FastControl)
+
+
+def _portal():
+    # Opening on the newest day lets a refresh with nothing new stop at the probe
+    return FakePortal(days=2, end=date.today() - timedelta(days=2), newest_first=True)
+
+
+def _coordinator(hass, portal):
+    hass.data.setdefault(DOMAIN, {})[DATA_SCHEDULER] = FetchScheduler(jitter=0)
+    coordinator = STWaterMeterUpdateCoordinator(hass, config_entry())
+    coordinator.driver_pool = DriverPool(portal.driver, 0)
+    return coordinator
+
+
+async def _refresh(coordinator):
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    return coordinator._stored[STORE_LAST_STATISTIC]
+
+
+def _run(tmp_path, test):
+    async def run():
+        async with running_hass(tmp_path) as hass:
+            return await test(hass)
+
+    return asyncio.run(run())
+
+
+def test_recorder_is_read_once_per_start_up(tmp_path, monkeypatch):
+    recorder = Recorder().install(monkeypatch)
+    portal = _portal()
+
+    async def refreshes(hass):
+        coordinator = _coordinator(hass, portal)
+        first = await _refresh(coordinator)
+        unchanged = await _refresh(coordinator)
+        portal.days.append(portal.days[-1] + timedelta(days=1))
+        newer = await _refresh(coordinator)
+        queries = recorder.queries
+        # After a restart the cached values are checked against the recorder once
+        restarted = _coordinator(hass, portal)
+        await _refresh(restarted)
+        return first, unchanged, newer, queries
+
+    first, unchanged, newer, queries = _run(tmp_path, refreshes)
+
+    assert queries == 1
+    assert recorder.queries == 2
+    assert first == unchanged
+    assert newer["end"] == first["end"] + 24 * 3600
+    assert newer["sum"] == recorder.written(STATISTIC_ID)[-1]["sum"]
+
+
+def test_failed_write_reads_the_recorder_again(tmp_path, monkeypatch):
+    recorder = Recorder(faults={1}).install(monkeypatch)
+    portal = _portal()
+
+    async def refreshes(hass):
+        coordinator = _coordinator(hass, portal)
+        await coordinator.async_refresh()
+        assert STORE_LAST_STATISTIC not in coordinator._stored
+        return await _refresh(coordinator)
+
+    cached = _run(tmp_path, refreshes)
+
+    assert recorder.queries == 2
+    # One failed write, then both days from the recorder's last hour
+    assert len(recorder.writes) == 3
+    assert len(recorder.written(STATISTIC_ID)) == 48
+    assert cached["sum"] == recorder.written(STATISTIC_ID)[-1]["sum"]
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        {"statistic_id": "st_water:consumption_2"},
+        {"end": 1800},
+        {"end": 3600 * (int(time.time()) // 3600 + 2)},
+        {"sum": -1},
+    ],
+    ids=["other statistic", "mid-hour end", "future end", "negative sum"],
+)
+def test_bad_cached_entry_is_replaced_from_the_recorder(tmp_path, monkeypatch, bad):
+    recorder = Recorder().install(monkeypatch)
+    portal = _portal()
+
+    async def refreshes(hass):
+        coordinator = _coordinator(hass, portal)
+        good = await _refresh(coordinator)
+        writes = len(recorder.writes)
+        coordinator._stored[STORE_LAST_STATISTIC] = {**good, **bad}
+        return good, await _refresh(coordinator), writes
+
+    good, replaced, writes = _run(tmp_path, refreshes)
+
+    assert recorder.queries == 2
+    assert replaced == good
+    # Nothing was written from the bad values
+    assert len(recorder.writes) == writes
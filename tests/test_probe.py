@@ -0,0 +1,88 @@
+from datetime import datetime, time, timedelta, timezone
+
+import homeassistant.util.dt as dt_util
+from selenium.webdriver.common.by import By
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+
+from custom_components.st_water.coordinator import landing_is_stored
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import TrackerProbe, get_water_usage, probe_tracker
+
+
+def _end_of(day):
+    return dt_util.as_utc(datetime.combine(day + timedelta(days=1), time(), tzinfo=dt_util.DEFAULT_TIME_ZONE))
+
+
+def _fetch(portal, last_end, stored_signature=None):
+    landings = []
+
+    def probe(landing):
+        landings.append(landing)
+        return not landing_is_stored(landing, last_end, stored_signature)
+
+    data = get_water_usage(
+        USERNAME,
+        PASSWORD,
+        "http://grid",
+        pool=DriverPool(portal.driver, idle_ttl=0),
+        since=last_end.timestamp(),
+        control=FastControl(),
+        probe=probe,
+    )
+    return data, landings[0]
+
+
+def test_landing_on_the_oldest_day_still_walks_to_new_days():
+    portal = FakePortal()
+    last_end = _end_of(portal.days[-4])
+
+    data, landing = _fetch(portal, last_end)
+
+    assert not landing.newest
+    assert landing.latest_day == portal.days[0].isoformat()
+    assert data == portal.expected(portal.days[-3:])
+
+
+def test_newest_landing_with_nothing_new_skips_the_walk():
+    portal = FakePortal(newest_first=True)
+    full = FakePortal(newest_first=True)
+    _fetch(full, _end_of(full.days[-2]))
+
+    data, landing = _fetch(portal, _end_of(portal.days[-1]))
+
+    assert landing.newest
+    assert data == {}
+    assert portal.commands < full.commands / 2
+
+
+def test_newest_landing_with_new_hours_walks():
+    portal = FakePortal(newest_first=True)
+
+    data, landing = _fetch(portal, _end_of(portal.days[-2]))
+
+    assert landing.newest
+    assert data == portal.expected(portal.days[-1:])
+
+
+def test_unchanged_signature_only_counts_on_the_newest_view():
+    probe = TrackerProbe("abc", latest_day=None)
+    last_end = datetime(2024, 5, 1, tzinfo=timezone.utc)
+
+    assert not landing_is_stored(probe, last_end, "abc")
+    assert landing_is_stored(TrackerProbe("abc", newest=True), last_end, "abc")
+    assert not landing_is_stored(TrackerProbe("abc", newest=True), None, "abc")
+
+
+def test_probe_reads_the_newest_flag_without_clicking():
+    portal = FakePortal(newest_first=True)
+    driver = portal.driver()
+    driver.logged_in = True
+    driver.get("https://example.invalid/")
+    driver.find_element(By.LINK_TEXT, "MY SMART TRACKER").click()
+    day = driver.day
+
+    landing = probe_tracker(driver)
+
+    assert landing.newest
+    assert landing.latest_hour == 23
+    assert driver.day == day
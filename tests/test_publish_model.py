@@ -0,0 +1,108 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from custom_components.st_water.const import ADAPTIVE_MAX_INTERVAL, ADAPTIVE_MIN_INTERVAL
+from custom_components.st_water.publish_model import PublishModel
+
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _simulate(publish_times, days, model=None):
+    """Drive the model with a simulated clock over days of publishes.
+
+    Returns the poll times and, for each publish, how long after it the data
+    was fetched.
+    """
+    model = model or PublishModel()
+    now = START
+    polls = []
+    lags = []
+    pending = sorted(publish_times)
+    end = START + timedelta(days=days)
+    while now < end:
+        published = [p for p in pending if p <= now]
+        pending = [p for p in pending if p > now]
+        lags.extend(now - p for p in published)
+        model.record_poll(now, bool(published))
+        polls.append(now)
+        now += model.next_interval(now)
+    return model, polls, lags
+
+
+def _daily(days, hour, minute=0, jitter=0, seed=1):
+    rng = random.Random(seed)
+    first = START.replace(hour=hour, minute=minute) + timedelta(days=1)
+    return [first + timedelta(days=d, minutes=rng.gauss(0, jitter)) for d in range(days)]
+
+
+def _polls_per_day(polls, first_day, last_day):
+    start = START + timedelta(days=first_day)
+    end = START + timedelta(days=last_day)
+    return sum(1 for p in polls if start <= p < end) / (last_day - first_day)
+
+
+def test_steady_state_costs_one_or_two_polls_a_day():
+    model, polls, lags = _simulate(_daily(60, 3, jitter=15), 60)
+
+    centre, spread = model.window()
+    assert abs(centre - 180) < 30
+    assert spread < 60
+    # Learning takes a few days; after that a day costs one or two polls
+    assert _polls_per_day(polls, 10, 60) <= 2
+    steady_lags = lags[10:]
+    assert max(steady_lags) <= timedelta(hours=2)
+    assert sum(steady_lags, timedelta()) / len(steady_lags) < timedelta(minutes=45)
+
+
+def test_learning_polls_every_max_interval():
+    _, polls, _ = _simulate(_daily(3, 3), 1)
+
+    assert _polls_per_day(polls, 0, 1) == 86400 / ADAPTIVE_MAX_INTERVAL
+
+
+def test_follows_a_publish_time_that_moves():
+    early = _daily(20, 3, jitter=10)
+    late = _daily(60, 7, jitter=10, seed=2)[20:]
+
+    model, polls, lags = _simulate(early + late, 60)
+
+    # Once the old times have aged out, the prediction sits on the new time
+    centre, _ = model.window()
+    assert abs(centre - 7 * 60) < 30
+    assert _polls_per_day(polls, 50, 60) <= 2
+    assert max(lags[50:]) <= timedelta(hours=2)
+
+
+def test_late_data_backs_off_from_the_predicted_time():
+    model = PublishModel(observations=[180, 180, 180])
+    predicted = datetime(2024, 5, 10, 3, 0, tzinfo=timezone.utc)
+
+    intervals = []
+    now = predicted
+    for _ in range(5):
+        model.record_poll(now, False)
+        interval = model.next_interval(now)
+        intervals.append(interval.total_seconds())
+        now += interval
+
+    assert intervals == [
+        min(ADAPTIVE_MIN_INTERVAL * 2 ** i, ADAPTIVE_MAX_INTERVAL) for i in range(5)
+    ]
+    # 13.5 hours late the cycle is over: wait for the next predicted time
+    assert now + model.next_interval(now) == predicted + timedelta(days=1)
+
+
+@pytest.mark.parametrize("hour", [0, 1, 23])
+def test_waits_for_the_predicted_time_across_midnight(hour):
+    model = PublishModel(observations=[23 * 60 + 50] * 29)
+    found = datetime(2024, 5, 10, hour, 0, tzinfo=timezone.utc)
+    model.record_poll(found, True)
+
+    following = found + model.next_interval(found)
+
+    centre, _ = model.window()
+    assert abs(centre - (23 * 60 + 50)) < 5
+    assert following.hour == 23 and abs(following.minute - 50) < 5
+    assert timedelta(hours=12) < following - found < timedelta(days=1, hours=1)
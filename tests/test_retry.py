@@ -0,0 +1,140 @@
+import pytest
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+from selenium.common.exceptions import WebDriverException
+
+from custom_components.st_water.const import (
+    FETCH_RETRIES,
+    FETCH_TIMEOUT,
+    PHASE_TIMEOUTS,
+    RETRY_MAX_DELAY,
+)
+from custom_components.st_water.replay import ReplayDriver
+from custom_components.st_water.retry import (
+    ERROR_AUTH,
+    ERROR_SESSION,
+    ERROR_TRANSIENT,
+    ERROR_UNANSWERED,
+    LoginFailedError,
+    LoginUnansweredError,
+    classify_error,
+    retry_delay,
+)
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_water_usage, iter_water_usage, verify_login
+
+
+def _replay_fetch(portal, faults):
+    driver = ReplayDriver(portal.replay_pages(), faults=faults)
+    control = FastControl()
+    data = get_water_usage(
+        USERNAME, PASSWORD, "http://grid", pool=DriverPool(lambda: driver, idle_ttl=0), control=control
+    )
+    return data, control.metrics, driver
+
+
+def _command_count(portal):
+    _, _, driver = _replay_fetch(portal, ())
+    return driver.commands
+
+
+@pytest.mark.parametrize("where", [0.6, 0.8, 0.95])
+def test_transient_fault_resumes_in_the_same_session(where):
+    portal = FakePortal()
+    fault = int(_command_count(portal) * where)
+
+    data, metrics, _ = _replay_fetch(portal, [fault])
+
+    assert data == portal.expected()
+    assert metrics.retries == 1
+
+
+def test_faults_in_every_attempt_give_up_after_fetch_retries():
+    portal = FakePortal()
+    fault = int(_command_count(portal) * 0.7)
+    # The first fault, then the first command of every following attempt
+    faults = range(fault, fault + FETCH_RETRIES * 10)
+
+    with pytest.raises(WebDriverException):
+        _replay_fetch(portal, faults)
+
+
+def test_lost_session_starts_a_new_one_and_resumes():
+    portal = FakePortal()
+    control = FastControl()
+    pool = DriverPool(portal.driver, idle_ttl=0)
+    days = []
+    for day in iter_water_usage(USERNAME, PASSWORD, "http://grid", pool=pool, control=control):
+        days.append(day)
+        if len(days) == 3:
+            # The grid restarts mid-walk
+            portal.drivers[0].closed = True
+
+    assert dict(days) == portal.expected()
+    assert [d for d, _ in days] == sorted({d for d, _ in days})
+    assert portal.sessions == portal.logins == 2
+    assert control.metrics.retries == 1
+
+
+def test_rejected_password_fails_straight_away():
+    portal = FakePortal()
+
+    with pytest.raises(LoginFailedError, match="incorrect"):
+        get_water_usage(USERNAME, "wrong", "http://grid", pool=DriverPool(portal.driver, 0), control=FastControl())
+
+    assert portal.rejected == 1
+    assert portal.sessions == 1
+
+
+def test_slow_answer_to_the_log_in_is_not_a_rejection():
+    # The log-in phase is nearly used up when the form is submitted
+    portal = FakePortal(submit_delay=1.5)
+    timeouts = {**PHASE_TIMEOUTS, "login": 1, "login_submit": 5}
+
+    verify_login(USERNAME, PASSWORD, "http://grid", DriverPool(portal.driver, 0), FastControl(timeouts))
+
+    assert portal.logins == 1
+    assert portal.rejected == 0
+
+
+def test_log_in_answer_that_never_comes_is_not_submitted_again():
+    portal = FakePortal(submit_delay=60)
+    timeouts = {**PHASE_TIMEOUTS, "login_submit": 0.5}
+
+    with pytest.raises(LoginUnansweredError) as err:
+        verify_login(USERNAME, PASSWORD, "http://grid", DriverPool(portal.driver, 0), FastControl(timeouts))
+
+    assert classify_error(err.value) == ERROR_UNANSWERED
+    assert portal.submits == 1
+    assert portal.rejected == 0
+
+
+def test_fetch_ends_when_the_log_in_is_not_answered():
+    portal = FakePortal(submit_delay=60)
+    timeouts = {**PHASE_TIMEOUTS, "login_submit": 0.5}
+
+    with pytest.raises(LoginUnansweredError):
+        get_water_usage(USERNAME, PASSWORD, "http://grid", pool=DriverPool(portal.driver, 0), control=FastControl(timeouts))
+
+    # Another attempt would have typed the password into the form again
+    assert portal.submits == 1
+    assert portal.sessions == 1
+
+
+def test_classify_error():
+    assert classify_error(LoginFailedError()) == ERROR_AUTH
+    assert classify_error(WebDriverException("stale")) == ERROR_TRANSIENT
+    assert classify_error(ConnectionRefusedError()) == ERROR_SESSION
+
+
+def test_retry_delay_backs_off_with_jitter():
+    assert [retry_delay(a, rng=lambda: 1.0) for a in (1, 2, 3)] == [5, 10, 20]
+    assert retry_delay(1, rng=lambda: 0.0) == 2.5
+    assert retry_delay(20, rng=lambda: 1.0) == RETRY_MAX_DELAY
+
+
+def test_fetch_timeout_covers_every_attempt():
+    per_attempt = sum(PHASE_TIMEOUTS[p] for p in ("login", "login_submit", "navigation", "extraction"))
+
+    assert FETCH_TIMEOUT >= FETCH_RETRIES * per_attempt + sum(
+        retry_delay(a, rng=lambda: 1.0) for a in range(1, FETCH_RETRIES)
+    )
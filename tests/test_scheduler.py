@@ -0,0 +1,97 @@
+import asyncio
+import random
+from collections import Counter
+
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+
+from custom_components.st_water.const import SESSION_IDLE_TTL
+from custom_components.st_water.scheduler import FetchScheduler
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_water_usage
+
+GRIDS = ["http://grid-a:4444", "http://grid-b:4444", "http://grid-c:4444"]
+
+
+async def _refresh_all(scheduler, entries, fetch_seconds):
+    active = Counter()
+    peak = Counter()
+    done = []
+
+    async def refresh(name, grid):
+        async with scheduler.slot(grid, name):
+            active[grid] += 1
+            peak[grid] = max(peak[grid], active[grid])
+            await asyncio.sleep(fetch_seconds)
+            active[grid] -= 1
+            done.append(name)
+
+    # Every entry's timer fires at once, as after a restart
+    await asyncio.gather(*(refresh(name, grid) for name, grid in entries))
+    return peak, done
+
+
+def test_many_entries_never_exceed_the_grid_limit():
+    entries = [(f"entry {i}", GRIDS[i % len(GRIDS)]) for i in range(60)]
+    scheduler = FetchScheduler(limit=2, jitter=0)
+
+    peak, done = asyncio.run(_refresh_all(scheduler, entries, 0.01))
+
+    assert sorted(done) == sorted(name for name, _ in entries)
+    assert peak == {grid: 2 for grid in GRIDS}
+    diagnostics = scheduler.diagnostics()
+    assert set(diagnostics) == set(GRIDS)
+    for grid in GRIDS:
+        assert diagnostics[grid]["active"] == diagnostics[grid]["waiting"] == 0
+        assert len(diagnostics[grid]["recent_waits"]) == 20
+        # Ten rounds of two fetches queue up behind each other
+        assert diagnostics[grid]["max_wait"] >= 0.08
+
+
+def test_grids_do_not_wait_for_each_other():
+    entries = [("busy", GRIDS[0]), ("also busy", GRIDS[0]), ("other grid", GRIDS[1])]
+    scheduler = FetchScheduler(limit=1, jitter=0)
+
+    asyncio.run(_refresh_all(scheduler, entries, 0.05))
+
+    waits = scheduler.diagnostics()
+    assert waits[GRIDS[0]]["max_wait"] >= 0.05
+    assert waits[GRIDS[1]]["max_wait"] < 0.05
+
+
+def test_jitter_spreads_simultaneous_timers(monkeypatch):
+    delays = iter([0.05, 0.0, 0.1])
+    monkeypatch.setattr(random, "uniform", lambda low, high: next(delays))
+    entries = [("second", GRIDS[0]), ("first", GRIDS[0]), ("third", GRIDS[0])]
+    scheduler = FetchScheduler(limit=1, jitter=30)
+
+    _, done = asyncio.run(_refresh_all(scheduler, entries, 0))
+
+    assert done == ["first", "second", "third"]
+
+
+def test_idle_session_of_another_entry_makes_room_on_a_full_grid():
+    # A standalone container: one session at a time, idle or not
+    portal = FakePortal(capacity=1)
+    scheduler = FetchScheduler(limit=1, jitter=0)
+    pools = {name: DriverPool(portal.driver, SESSION_IDLE_TTL) for name in ("first", "second")}
+    for pool in pools.values():
+        scheduler.add_pool(GRIDS[0], pool)
+
+    async def refresh(name):
+        pool = pools[name]
+        async with scheduler.slot(GRIDS[0], name, pool=pool):
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: get_water_usage(USERNAME, PASSWORD, GRIDS[0], pool=pool, control=FastControl())
+            )
+
+    async def refreshes():
+        return [await refresh(name) for name in ("first", "second", "second")]
+
+    results = asyncio.run(refreshes())
+
+    assert results == [portal.expected()] * 3
+    # The first entry's idle session was quit for the second, whose own is reused
+    assert pools["first"].idle_count == 0
+    assert pools["second"].idle_count == 1
+    assert portal.sessions == 2
+    assert portal.open_sessions == 1
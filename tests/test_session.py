@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+from home import config_entry, running_hass
+
+from custom_components.st_water.const import GRID_SESSION_TIMEOUT, SESSION_IDLE_TTL
+from custom_components.st_water.coordinator import STWaterMeterUpdateCoordinator
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_water_usage
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fetch(pool):
+    return get_water_usage(USERNAME, PASSWORD, "http://grid", pool=pool, control=FastControl())
+
+
+def test_pooled_session_is_reused_without_logging_in_again():
+    portal = FakePortal()
+    pool = DriverPool(portal.driver, idle_ttl=600)
+
+    first = _fetch(pool)
+    second = _fetch(pool)
+
+    assert first == second == portal.expected()
+    assert pool.sessions_created == portal.sessions == 1
+    assert portal.logins == 1
+    assert pool.idle_count == 1
+
+
+def test_pool_without_idle_ttl_starts_and_logs_in_every_time():
+    portal = FakePortal()
+
+    for _ in range(3):
+        get_water_usage(
+            USERNAME, PASSWORD, "http://grid", pool=DriverPool(portal.driver, idle_ttl=0), control=FastControl()
+        )
+
+    assert portal.sessions == portal.logins == 3
+    assert all(d.closed for d in portal.drivers)
+
+
+def test_dead_pooled_session_is_replaced():
+    portal = FakePortal()
+    pool = DriverPool(portal.driver, idle_ttl=600)
+    _fetch(pool)
+    # The grid dropped the idle session
+    portal.drivers[0].closed = True
+
+    assert _fetch(pool) == portal.expected()
+    assert pool.sessions_created == 2
+    assert portal.logins == 2
+
+
+def test_idle_session_is_quit_after_the_ttl():
+    portal = FakePortal()
+    clock = Clock()
+    pool = DriverPool(portal.driver, idle_ttl=600, clock=clock)
+    _fetch(pool)
+
+    clock.now = 599
+    pool.evict_idle()
+    assert pool.idle_count == 1
+
+    clock.now = 600
+    pool.evict_idle()
+    assert pool.idle_count == 0
+    assert portal.drivers[0].closed
+
+    _fetch(pool)
+    assert portal.sessions == portal.logins == 2
+
+
+def test_close_quits_idle_sessions():
+    portal = FakePortal()
+    pool = DriverPool(portal.driver, idle_ttl=600)
+    _fetch(pool)
+
+    pool.close()
+
+    assert pool.idle_count == 0
+    assert portal.drivers[0].closed
+
+
+def test_idle_sessions_expire_before_the_grid_ends_them():
+    assert 0 < SESSION_IDLE_TTL < GRID_SESSION_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    ("next_refresh", "kept"),
+    [(timedelta(hours=24), 0), (timedelta(minutes=30), 0), (timedelta(seconds=SESSION_IDLE_TTL), 1)],
+)
+def test_session_is_only_kept_for_a_refresh_due_within_the_ttl(tmp_path, next_refresh, kept):
+    portal = FakePortal()
+
+    async def refresh_finished():
+        async with running_hass(tmp_path) as hass:
+            coordinator = STWaterMeterUpdateCoordinator(hass, config_entry())
+            coordinator.driver_pool = DriverPool(portal.driver, SESSION_IDLE_TTL)
+            await hass.async_add_executor_job(_fetch, coordinator.driver_pool)
+            coordinator.update_interval = next_refresh
+
+            await coordinator._async_quit_sessions_not_needed()
+
+            return coordinator.driver_pool.idle_count
+
+    assert asyncio.run(refresh_finished()) == kept
+    assert portal.drivers[0].closed == (not kept)
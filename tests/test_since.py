@@ -0,0 +1,65 @@
+from datetime import datetime, time, timedelta, timezone
+
+import homeassistant.util.dt as dt_util
+import pytest
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+
+from custom_components.st_water import stw_consumption
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_water_usage
+
+
+@pytest.fixture
+def time_zone():
+    # Far enough from UTC that local midnight falls on the previous UTC date
+    dt_util.set_default_time_zone(dt_util.get_time_zone("Pacific/Auckland"))
+    yield
+    dt_util.set_default_time_zone(timezone.utc)
+
+
+def _fetch(portal, since=None):
+    pool = DriverPool(portal.driver, idle_ttl=0)
+    data = get_water_usage(USERNAME, PASSWORD, "http://grid", pool=pool, since=since, control=FastControl())
+    return data, portal.drivers[-1].commands
+
+
+def _local_midnight(day):
+    return datetime.combine(day, time(), tzinfo=dt_util.DEFAULT_TIME_ZONE).timestamp()
+
+
+@pytest.mark.parametrize("mode", ["script", "page_source", "element"])
+def test_since_skips_stored_days(monkeypatch, time_zone, mode):
+    monkeypatch.setattr(stw_consumption, "EXTRACTION_MODE", mode)
+    portal = FakePortal()
+    since_day = portal.days[-3]
+
+    everything, without_since = _fetch(portal)
+    newest, with_since = _fetch(portal, since=_local_midnight(since_day))
+
+    assert everything == portal.expected()
+    assert newest == portal.expected(portal.days[-3:])
+    if mode == "element":
+        # Stored days cost one call for the date instead of one per bar
+        assert with_since < without_since
+    else:
+        # The date comes with the bars, so skipping a day saves nothing
+        assert with_since == without_since
+
+
+def test_since_compares_local_dates(time_zone):
+    portal = FakePortal()
+    since = _local_midnight(portal.days[-2])
+    # The same instant is still the day before in UTC
+    assert datetime.fromtimestamp(since, timezone.utc).date() == portal.days[-3]
+
+    data, _ = _fetch(portal, since=since)
+
+    assert sorted(data) == [d.isoformat() for d in portal.days[-2:]]
+
+
+def test_since_after_the_newest_day_yields_nothing(time_zone):
+    portal = FakePortal()
+
+    data, _ = _fetch(portal, since=_local_midnight(portal.days[-1] + timedelta(days=1)))
+
+    assert data == {}
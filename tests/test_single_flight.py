@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+from fakes import PASSWORD, USERNAME, FakePortal, FastControl
+
+from custom_components.st_water.scheduler import SingleFlight
+from custom_components.st_water.session import DriverPool
+from custom_components.st_water.stw_consumption import get_water_usage
+
+
+def test_concurrent_triggers_share_one_fetch():
+    portal = FakePortal(latency=0.002)
+    pool = DriverPool(portal.driver, idle_ttl=0)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return await asyncio.to_thread(
+            get_water_usage, USERNAME, PASSWORD, "http://grid", pool=pool, control=FastControl()
+        )
+
+    async def main():
+        flight = SingleFlight()
+        # Start-up, a reload, the timer and a manual refresh all at once
+        results = await asyncio.gather(*(flight.run("entry", fetch) for _ in range(10)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert portal.sessions == portal.logins == 1
+    assert all(r == portal.expected() for r in results)
+    assert flight.diagnostics() == []
+
+
+def test_callers_share_the_failure():
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("portal down")
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.run("entry", fetch) for _ in range(5)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+
+    assert len({id(e) for e in errors}) == 1
+    assert isinstance(errors[0], RuntimeError)
+
+
+def test_one_caller_cancelled_does_not_cancel_the_others():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "data"
+
+    async def main():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.run("entry", fetch))
+        second = asyncio.ensure_future(flight.run("entry", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(main()) == ("data", True)
+
+
+def test_entries_do_not_share_fetches():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+
+    async def main():
+        flight = SingleFlight()
+        await asyncio.gather(flight.run("one", fetch), flight.run("two", fetch))
+
+    asyncio.run(main())
+
+    assert len(calls) == 2
+
+
+def test_cancelled_flight_is_not_joined_after_a_reload():
+    started = []
+
+    def fetch_for(coordinator):
+        async def fetch():
+            started.append(coordinator)
+            await asyncio.sleep(10)
+            return coordinator
+
+        return fetch
+
+    async def main():
+        flight = SingleFlight()
+        old = asyncio.ensure_future(flight.run("entry", fetch_for("old")))
+        await asyncio.sleep(0.01)
+        # Unloading the entry cancels its fetch
+        flight.cancel("entry")
+        assert flight.diagnostics() == []
+        with pytest.raises(asyncio.CancelledError):
+            await old
+
+        async def quick():
+            started.append("new")
+            return "new"
+
+        return await flight.run("entry", quick)
+
+    assert asyncio.run(main()) == "new"
+    assert started == ["old", "new"]
+
+
+def test_cancel_without_a_flight_does_nothing():
+    SingleFlight().cancel("entry")
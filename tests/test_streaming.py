@@ -0,0 +1,82 @@
+import asyncio
+import time
+from datetime import date, timedelta
+
+import pytest
+from home import Recorder, config_entry, running_hass
+
+from custom_components.st_water.coordinator import STWaterMeterUpdateCoordinator
+from custom_components.st_water.metrics import FetchMetrics
+
+DAYS = [date(2024, 5, 10) + timedelta(days=i) for i in range(4)]
+STATISTIC_ID = "st_water:consumption"
+
+
+def _hours():
+    return {f"{h:02d}:00": 1 for h in range(24)}
+
+
+def _days(fetched):
+    for day in DAYS:
+        # Scraping a day takes long enough for the loop to commit the one before
+        time.sleep(0.05)
+        fetched.append(day)
+        yield day.isoformat(), _hours()
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    # The second write fails
+    return Recorder(faults={2}).install(monkeypatch)
+
+
+def _run(tmp_path, test):
+    async def run():
+        async with running_hass(tmp_path) as hass:
+            coordinator = STWaterMeterUpdateCoordinator(hass, config_entry())
+            # What a refresh sets up before it fetches
+            await coordinator._async_load_store()
+            coordinator._metrics = FetchMetrics()
+            return await test(hass, coordinator)
+
+    return asyncio.run(run())
+
+
+def test_days_after_a_failed_write_are_not_committed(tmp_path, recorder):
+    async def commit_each_day(hass, coordinator):
+        for day in DAYS:
+            coordinator._commit_rows({day.isoformat(): _hours()})
+        return coordinator
+
+    coordinator = _run(tmp_path, commit_each_day)
+
+    assert len(recorder.writes) == 2
+    assert coordinator._write_failed
+    # Only the first day counts as stored, so the next refresh starts after it
+    assert recorder.written(STATISTIC_ID) == recorder.writes[0]
+    assert coordinator._running_total == 24
+    assert coordinator._new_rows == 24
+
+
+def test_streaming_stops_fetching_after_a_failed_write(tmp_path, recorder):
+    fetched = []
+
+    async def stream(hass, coordinator):
+        return await hass.async_add_executor_job(coordinator._stream_days, _days(fetched))
+
+    assert _run(tmp_path, stream) == 2
+    # The third day was scraped before the failure was seen, the fourth never was
+    assert fetched == DAYS[:3]
+    assert len(recorder.writes) == 2
+
+
+def test_streamed_days_are_committed_in_order(tmp_path, monkeypatch):
+    recorder = Recorder().install(monkeypatch)
+
+    async def stream(hass, coordinator):
+        received = await hass.async_add_executor_job(coordinator._stream_days, _days([]))
+        await hass.async_block_till_done()
+        return received, coordinator._running_total
+
+    assert _run(tmp_path, stream) == (len(DAYS), 24 * len(DAYS))
+    assert [rows[0]["start"].date() for rows in recorder.writes] == DAYS